@@ -5,18 +5,30 @@ ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, ROOT_DIR)
 
 
+import time
+
 import streamlit as st
 import pandas as pd
-from datetime import datetime
 
 from modules.auth import autenticar
-from modules.loader import carregar_planilha_local
-from modules.metrics import calcular_metricas
-from modules.charts import grafico_acoes_por_cidade, grafico_motivos, grafico_evolucao_nodes
-from modules.pdf_export import gerar_pdf, gerar_pdf_completo
+from modules.loader import carregar_dados
+from modules.config import BACKEND_CONSULTAS, OBSERVAR_DADOS
+from modules.catalog import obter_catalogo
+from modules.cube import obter_cubo
+from modules.filters import aplicar_filtros, obter_indice
+from modules.validation import resumo_quarentena
+from modules.detail_table import (
+    COLUNAS_DETALHE, ROTULOS, TAMANHOS_PAGINA,
+    exportar_csv, exportar_parquet, formatar_pagina, pagina, selecionar_linhas, total_paginas
+)
+from modules import profiling
 
 st.set_page_config("Gerencial QOE", layout="wide", page_icon="📊")
 
+# Tempos das etapas desta execução do script (painel de desempenho do admin)
+profiling.iniciar_execucao()
+inicio_execucao = time.perf_counter()
+
 # CSS customizado
 st.markdown("""
 <style>
@@ -61,62 +73,46 @@ if st.sidebar.button("🚪 Logout", use_container_width=True):
 
 
 
-# CARREGA PLANILHA - carrega da pasta data/planilha.xlsx
-def processar_dataframe(df):
-    """Processa o DataFrame após carregamento"""
-    # Validação de colunas essenciais
-    colunas_obrigatorias = ["QOE ANTES", "QOE DEP", "SETOR"]
-    colunas_faltando = [col for col in colunas_obrigatorias if col not in df.columns]
-    
-    if colunas_faltando:
-        raise ValueError(f"A planilha está faltando as seguintes colunas obrigatórias: {', '.join(colunas_faltando)}")
-    
-    # Garante que Node existe, criando se necessário
-    if "Node" not in df.columns:
-        df["Node"] = df.index.astype(str)
-    
-    # Converte Data Execução se existir
-    if "Data Execução" in df.columns:
-        df["Data Execução"] = pd.to_datetime(df["Data Execução"], errors="coerce")
-        df["Mes"] = df["Data Execução"].dt.to_period("M").astype(str)
-    
-    return df
-
-# Carrega dados da planilha local (data/planilha.xlsx)
-# O sistema sempre carrega a última versão do arquivo
-df_carregado = carregar_planilha_local()
-if df_carregado is not None:
-    try:
-        df = processar_dataframe(df_carregado)
-        st.session_state.df = df
-    except Exception as e:
-        st.error(f"❌ Erro ao processar a planilha: {str(e)}")
-        st.stop()
-else:
+# CARREGA PLANILHA - carrega da pasta data/Gerencial_QOE.xlsx (ou de QOE_FONTE_DADOS,
+# que pode ser um diretório com várias planilhas)
+# O sistema sempre carrega a última versão do arquivo; o cache do processo
+# evita reler e reprocessar a planilha enquanto ela não muda
+try:
+    dados = carregar_dados()
+except Exception as e:
+    st.error(f"❌ Erro ao processar a planilha: {str(e)}")
+    st.stop()
+
+if dados is None:
     st.error("❌ Planilha não encontrada. Por favor, adicione o arquivo 'Gerencial_QOE.xlsx' na pasta 'data/' do projeto.")
     st.info("📋 O arquivo deve estar localizado em: data/Gerencial_QOE.xlsx")
     st.stop()
 
-df = st.session_state.df
-# MENU (dinâmico por setor, em ordem alfabética)
-def _formatar_setor_label(up: str) -> str:
-    especiais = {"IAT": "IaT", "MDU": "MDU", "DTC": "DTC", "REDE": "Rede"}
-    if up in especiais:
-        return especiais[up]
-    return up.capitalize()
+# Versões novas da planilha são carregadas em segundo plano e trocadas de uma
+# vez; esta execução do script usa a versão publicada no início dela
+observador = None
+if OBSERVAR_DADOS:
+    from modules.watcher import iniciar_observador
 
-setor_map = {}      # label bonito -> UPPER real do setor
-setores_labels = [] # lista de labels bonitos
+    observador = iniciar_observador(dados.caminho)
 
-if isinstance(df, pd.DataFrame) and "SETOR" in df.columns:
-    for s in df["SETOR"].dropna().astype(str).str.strip().tolist():
-        if not s:
-            continue
-        up = s.upper()
-        label = _formatar_setor_label(up)
-        setor_map[label] = up
+# Todas as sessões usam o mesmo ConjuntoDados da versão carregada; nada dos
+# dados é guardado em st.session_state
+df = dados.df
+if BACKEND_CONSULTAS == "sqlite":
+    from modules.sql_backend import obter_base_sql
 
-    setores_labels = sorted(setor_map.keys(), key=lambda x: x.upper())
+    # Mesma interface do cubo; filtros e agregações executados pelo SQLite
+    cubo = obter_base_sql(dados)
+else:
+    cubo = obter_cubo(dados)
+    indice = obter_indice(dados)
+# Setores, meses e cidades da versão carregada (calculados uma vez por versão)
+catalogo = obter_catalogo(dados)
+
+# MENU (dinâmico por setor, em ordem alfabética)
+setor_map = catalogo.setores                 # label bonito -> UPPER real do setor
+setores_labels = catalogo.rotulos_setores()  # lista de labels bonitos
 
 opcoes_menu = (
     ["Dashboard Geral"]
@@ -125,63 +121,62 @@ opcoes_menu = (
 )
 
 menu = st.sidebar.radio("Gerencial QOE", opcoes_menu)
+st.sidebar.caption(f"📄 Dados: versão {dados.versao[:8]} · carregada em {dados.carregado_em:%d/%m/%Y %H:%M}")
 
 
-def consolidar_nodes(df_base):
+# Função auxiliar para criar filtros
+def criar_filtros(setor=None):
     """
-    Consolida dados por NODE (valor absoluto)
-    Regras:
-    - QOE ANTES: média
-    - QOE DEP: melhor valor (máximo)
+    Cria filtros de mês e cidade; retorna (mes, cidade), com None quando não filtrado.
+    Só são oferecidos meses com ações no setor e cidades com ações no setor e mês escolhidos.
     """
-    df_base = df_base.copy()
+    col1, col2 = st.columns(2)
     
-    # Converte QOE para numérico
-    if "QOE ANTES" in df_base.columns:
-        df_base["QOE ANTES"] = pd.to_numeric(df_base["QOE ANTES"], errors="coerce")
-    if "QOE DEP" in df_base.columns:
-        df_base["QOE DEP"] = pd.to_numeric(df_base["QOE DEP"], errors="coerce")
+    with col1:
+        meses = ["Todos os meses"] + catalogo.opcoes("Mes", setor=setor)
+        mes_selecionado = st.selectbox("Filtrar por Mês", meses)
+    mes = None if mes_selecionado == "Todos os meses" else mes_selecionado
     
-    df_nodes = (
-        df_base
-        .groupby("Node", as_index=False)
-        .agg({
-            "QOE ANTES": "mean",
-            "QOE DEP": "max"
-        })
-    )
+    with col2:
+        cidades = ["Todas as cidades"] + catalogo.opcoes("Cidade", setor=setor, mes=mes)
+        cidade_selecionada = st.selectbox("Filtrar por Cidade", cidades)
+    cidade = None if cidade_selecionada == "Todas as cidades" else cidade_selecionada
+    
+    return mes, cidade
 
-    df_nodes["Melhorou"] = df_nodes["QOE DEP"] > df_nodes["QOE ANTES"]
-    df_nodes["Piorou"] = df_nodes["QOE DEP"] < df_nodes["QOE ANTES"]
-    df_nodes["Manteve"] = df_nodes["QOE DEP"] == df_nodes["QOE ANTES"]
-    df_nodes["Atingiu_80"] = df_nodes["QOE DEP"] >= 80
-    df_nodes["Atingiu_80_pos"] = (df_nodes["QOE ANTES"] < 80) & (df_nodes["QOE DEP"] >= 80)
 
-    return df_nodes
+def exibir_graficos(setor, mes, cidade, df_nodes):
+    """Gráficos da página; figuras reaproveitadas do cache para a mesma versão e filtros"""
+    # Plotly só é carregado quando uma página com gráficos é aberta
+    from modules.charts import (
+        exibir_figura, contar_evolucao,
+        figura_acoes_por_cidade, figura_motivos, figura_evolucao_nodes
+    )
+    from modules.chart_cache import figura_em_cache
 
+    filtros = (setor, mes, cidade)
 
-# Função auxiliar para criar filtros
-def criar_filtros(df):
-    """Cria filtros de mês e cidade"""
     col1, col2 = st.columns(2)
     
-    meses = ["Todos os meses"] + sorted(df["Mes"].dropna().unique().tolist()) if "Mes" in df.columns else ["Todos os meses"]
-    cidades = ["Todas as cidades"] + sorted(df["Cidade"].dropna().unique().tolist()) if "Cidade" in df.columns else ["Todas as cidades"]
-    
     with col1:
-        mes_selecionado = st.selectbox("Filtrar por Mês", meses)
+        exibir_figura(figura_em_cache(
+            dados.versao, "acoes_por_cidade", filtros,
+            lambda: cubo.acoes_por_cidade(setor, mes, cidade), figura_acoes_por_cidade
+        ))
     
     with col2:
-        cidade_selecionada = st.selectbox("Filtrar por Cidade", cidades)
+        exibir_figura(figura_em_cache(
+            dados.versao, "evolucao_nodes", filtros,
+            lambda: contar_evolucao(df_nodes), figura_evolucao_nodes
+        ))
     
-    # Aplica filtros
-    df_filtrado = df.copy()
-    if mes_selecionado != "Todos os meses":
-        df_filtrado = df_filtrado[df_filtrado["Mes"] == mes_selecionado]
-    if cidade_selecionada != "Todas as cidades":
-        df_filtrado = df_filtrado[df_filtrado["Cidade"] == cidade_selecionada]
+    st.divider()
     
-    return df_filtrado, mes_selecionado, cidade_selecionada
+    # Gráfico de motivos
+    exibir_figura(figura_em_cache(
+        dados.versao, "motivos", filtros,
+        lambda: cubo.contar_motivos(setor, mes, cidade), figura_motivos
+    ))
 
 # DASHBOARD GERAL
 if menu == "Dashboard Geral":
@@ -189,25 +184,10 @@ if menu == "Dashboard Geral":
     st.caption("Visão consolidada de todos os setores")
     
     # Filtros
-    df_filtrado, _, _ = criar_filtros(df)
+    mes, cidade = criar_filtros()
     
-    # Calcula métricas
-    df_nodes = consolidar_nodes(df_filtrado)
-
-    m = {
-        "total_nodes": len(df_nodes),
-        "acoes": len(df_filtrado),
-        "qoe_antes": round(df_nodes["QOE ANTES"].mean(), 1),
-        "qoe_depois": round(df_nodes["QOE DEP"].mean(), 1),
-        "melhoraram": int(df_nodes["Melhorou"].sum()),
-        "pioraram": int(df_nodes["Piorou"].sum()),
-        "mantiveram": int(df_nodes["Manteve"].sum()),
-        "nodes_80": int(df_nodes["Atingiu_80"].sum()),
-        "atingiram_80": int(df_nodes["Atingiu_80_pos"].sum()),
-        "perc_atingiram_80": round(
-            (df_nodes["Atingiu_80_pos"].sum() / max(1, (df_nodes["QOE ANTES"] < 80).sum())) * 100, 1
-        )
-    }
+    # Calcula métricas (POR NODE ABSOLUTO) a partir do cubo pré-agregado
+    df_nodes, m = cubo.consolidar(meses=mes, cidades=cidade)
 
     # Métricas principais
     col1, col2, col3, col4 = st.columns(4)
@@ -291,18 +271,7 @@ if menu == "Dashboard Geral":
     st.divider()
     
     # Gráficos
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        grafico_acoes_por_cidade(df_filtrado)
-    
-    with col2:
-        grafico_evolucao_nodes(df_filtrado)
-    
-    st.divider()
-    
-    # Gráfico de motivos
-    grafico_motivos(df_filtrado)
+    exibir_graficos(None, mes, cidade, df_nodes)
 
 # PÁGINAS DE SETORES
 elif menu.startswith("Setor"):
@@ -313,36 +282,15 @@ elif menu.startswith("Setor"):
     st.caption("Análise detalhada do setor")
 
     # Filtros
-    df_filtrado, _, _ = criar_filtros(df)
+    mes, cidade = criar_filtros(setor)
 
-    # Filtra por setor (case-insensitive)
-    if "SETOR" in df_filtrado.columns:
-        df_setor = df_filtrado[df_filtrado["SETOR"].astype(str).str.upper() == setor.upper()].copy()
-    else:
-        df_setor = pd.DataFrame()
+    # Calcula métricas (POR NODE ABSOLUTO) a partir do cubo pré-agregado
+    df_nodes, m = cubo.consolidar(setor, mes, cidade)
 
-    if len(df_setor) == 0:
+    if m["acoes"] == 0:
         st.warning(f"Não há dados para o setor {setor} com os filtros selecionados.")
         st.info("Tente ajustar os filtros de mês ou cidade.")
     else:
-        # Calcula métricas (POR NODE ABSOLUTO)
-        df_nodes = consolidar_nodes(df_setor)
-
-        m = {
-            "total_nodes": len(df_nodes),
-            "acoes": len(df_setor),
-            "qoe_antes": round(df_nodes["QOE ANTES"].mean(), 1),
-            "qoe_depois": round(df_nodes["QOE DEP"].mean(), 1),
-            "melhoraram": int(df_nodes["Melhorou"].sum()),
-            "pioraram": int(df_nodes["Piorou"].sum()),
-            "mantiveram": int(df_nodes["Manteve"].sum()),
-            "nodes_80": int(df_nodes["Atingiu_80"].sum()),
-            "atingiram_80": int(df_nodes["Atingiu_80_pos"].sum()),
-            "perc_atingiram_80": round(
-                (df_nodes["Atingiu_80_pos"].sum() / max(1, (df_nodes["QOE ANTES"] < 80).sum())) * 100, 1
-            ),
-            "perc_total_80": round((df_nodes["Atingiu_80"].sum() / max(1, len(df_nodes))) * 100, 1)
-        }
 
         # Métricas principais
         col1, col2, col3, col4 = st.columns(4)
@@ -414,70 +362,66 @@ elif menu.startswith("Setor"):
         st.divider()
         
         # Gráficos
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            grafico_acoes_por_cidade(df_setor)
-        
-        with col2:
-            grafico_evolucao_nodes(df_setor)
-        
-        st.divider()
-        
-        # Gráfico de motivos
-        grafico_motivos(df_setor)
+        exibir_graficos(setor, mes, cidade, df_nodes)
         
         st.divider()
         
         # Tabela de registros detalhados
         st.subheader("Registros Detalhados")
         
-        # Prepara dados para exibição
-        df_exibir = df_setor.copy()
-        
-        # Converte QOE para numérico
-        df_exibir["QOE ANTES"] = pd.to_numeric(df_exibir["QOE ANTES"], errors="coerce")
-        df_exibir["QOE DEP"] = pd.to_numeric(df_exibir["QOE DEP"], errors="coerce")
+        # Prepara dados para exibição (linhas do setor com os filtros)
+        if BACKEND_CONSULTAS == "sqlite":
+            df_setor = cubo.linhas(setor, mes, cidade, colunas=COLUNAS_DETALHE)
+        else:
+            df_setor = aplicar_filtros(df, setor=setor, cidade=cidade, mes=mes, indice=indice)
         
-        # Calcula evolução
-        df_exibir["Evolução"] = df_exibir["QOE DEP"] - df_exibir["QOE ANTES"]
-        
-        # Coluna >= 80
-        df_exibir[">= 80"] = df_exibir["QOE DEP"].apply(lambda x: "✅" if pd.notna(x) and x >= 80 else "")
+        # Busca e ordenação no servidor; só a página visível é formatada e enviada
+        col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+        with col1:
+            busca = st.text_input("Buscar", placeholder="Cidade, node, motivo ou responsável")
+        with col2:
+            opcoes_ordem = (
+                ["Ordem da planilha"] + [col for col in COLUNAS_DETALHE if col in df_setor.columns] + ["Evolução"]
+            )
+            ordem = st.selectbox("Ordenar por", opcoes_ordem, format_func=lambda c: ROTULOS.get(c, c))
+        with col3:
+            crescente = st.selectbox("Sentido", ["Crescente", "Decrescente"]) == "Crescente"
+        with col4:
+            tamanho_pagina = st.selectbox("Linhas por página", TAMANHOS_PAGINA)
         
-        # Seleciona colunas para exibir
-        colunas_exibir = []
-        if "Cidade" in df_exibir.columns:
-            colunas_exibir.append("Cidade")
-        if "Node" in df_exibir.columns:
-            colunas_exibir.append("Node")
-        if "Motivo" in df_exibir.columns:
-            colunas_exibir.append("Motivo")
-        colunas_exibir.extend(["QOE ANTES", "QOE DEP", "Evolução", ">= 80"])
-        if "Responsável" in df_exibir.columns:
-            colunas_exibir.append("Responsável")
+        posicoes = selecionar_linhas(
+            df_setor, busca, None if ordem == "Ordem da planilha" else ordem, crescente
+        )
+        paginas = total_paginas(len(posicoes), tamanho_pagina)
+        # A chave muda com a seleção, voltando para a primeira página
+        numero_pagina = st.number_input(
+            f"Página (de {paginas})", min_value=1, max_value=paginas, value=1,
+            key=f"pagina_{setor}_{mes}_{cidade}_{busca}_{ordem}_{crescente}_{tamanho_pagina}"
+        )
         
-        # Filtra apenas colunas que existem
-        colunas_exibir = [col for col in colunas_exibir if col in df_exibir.columns]
+        df_tabela = formatar_pagina(pagina(df_setor, posicoes, numero_pagina, tamanho_pagina))
         
-        df_tabela = df_exibir[colunas_exibir].copy()
+        with profiling.medir("app.st_dataframe"):
+            st.dataframe(df_tabela, use_container_width=True, hide_index=True)
         
-        # Formata valores
-        df_tabela["QOE ANTES"] = df_tabela["QOE ANTES"].apply(lambda x: f"{x:.0f}" if pd.notna(x) else "-")
-        df_tabela["QOE DEP"] = df_tabela["QOE DEP"].apply(lambda x: f"{x:.0f}" if pd.notna(x) else "-")
-        df_tabela["Evolução"] = df_tabela["Evolução"].apply(
-            lambda x: f"+{x:.0f}" if pd.notna(x) and x > 0 else (f"{x:.0f}" if pd.notna(x) else "-")
+        inicio_pagina = (numero_pagina - 1) * tamanho_pagina
+        st.caption(
+            f"Registros {min(inicio_pagina + 1, len(posicoes))}–{inicio_pagina + len(df_tabela)} "
+            f"de {len(posicoes)}"
         )
         
-        # Renomeia colunas
-        df_tabela = df_tabela.rename(columns={
-            "QOE ANTES": "QOE Antes",
-            "QOE DEP": "QOE Depois",
-            "Evolução": "Evolução",
-            ">= 80": "≥ 80"
-        })
-        
-        st.dataframe(df_tabela, use_container_width=True, hide_index=True)
+        # Arquivos gerados só ao clicar
+        col1, col2, _ = st.columns([1, 1, 4])
+        with col1:
+            st.download_button(
+                "⬇️ CSV", lambda: exportar_csv(df_setor, posicoes),
+                f"registros_{setor}.csv", mime="text/csv", on_click="ignore"
+            )
+        with col2:
+            st.download_button(
+                "⬇️ Parquet", lambda: exportar_parquet(df_setor, posicoes),
+                f"registros_{setor}.parquet", mime="application/octet-stream", on_click="ignore"
+            )
 
 
 
@@ -491,12 +435,33 @@ elif menu == "Exportar Relatórios":
     - **Análise por Cidade**: Métricas separadas para cada cidade
     """)
     
-    if st.button("📥 Gerar e Baixar Relatório PDF", type="primary", use_container_width=True):
-        with st.spinner("Gerando relatório PDF... Isso pode levar alguns segundos."):
-            try:
-                pdf = gerar_pdf_completo(df, calcular_metricas)
-                data_atual = datetime.now().strftime("%Y%m%d_%H%M%S")
-                nome_arquivo = f"Relatorio_QOE_{data_atual}.pdf"
+    # Geração em segundo plano: o mesmo relatório (tipo + versão da planilha)
+    # é gerado uma única vez e reaproveitado por todas as sessões
+    from modules.jobs import obter_fila, ERRO
+
+    fila = obter_fila()
+    
+    if st.button("📥 Gerar Relatório PDF", type="primary", use_container_width=True):
+        try:
+            st.session_state.relatorio_id = fila.submeter(dados, "completo")
+        except Exception as e:
+            st.error(f"❌ Erro ao gerar relatório: {str(e)}")
+    
+    trabalho = fila.status(st.session_state.get("relatorio_id"))
+    if trabalho is not None:
+        if trabalho.ativo:
+            st.progress(trabalho.progresso, text=f"Gerando relatório PDF... {trabalho.etapa}")
+            time.sleep(0.5)
+            st.rerun()
+        elif trabalho.estado == ERRO:
+            st.error(f"❌ Erro ao gerar relatório: {trabalho.erro}")
+        else:
+            pdf = fila.resultado(trabalho.id)
+            if pdf is None:
+                st.warning("O relatório não está mais disponível. Gere novamente.")
+            else:
+                data_geracao = trabalho.concluido_em.strftime("%Y%m%d_%H%M%S")
+                nome_arquivo = f"Relatorio_QOE_{data_geracao}.pdf"
                 st.download_button(
                     "⬇️ Baixar PDF",
                     pdf,
@@ -505,8 +470,6 @@ elif menu == "Exportar Relatórios":
                     use_container_width=True
                 )
                 st.success("✅ Relatório gerado com sucesso!")
-            except Exception as e:
-                st.error(f"❌ Erro ao gerar relatório: {str(e)}")
 
 # METODOLOGIA
 elif menu == "Metodologia":
@@ -530,18 +493,40 @@ elif menu == "Metodologia":
     
     - **Nas visões por setor, os Nodes são consolidados apenas dentro do setor selecionado.**
     
-    - **O sistema sempre utiliza a última planilha carregada como base de dados ativa.**
+    - **O sistema sempre utiliza a última versão da planilha carregada como base de dados ativa.**
+    
+    - **Linhas com QOE fora de 0 a 100, QOE em texto (exceto "ATUALIZANDO", tratado como ainda não medido), data de execução inválida ou sem setor são desconsideradas.**
+    
+    - **Com um diretório de planilhas (uma por mês, ou uma planilha com várias abas), todas são consolidadas juntas, como se fossem uma única planilha.**
     """)
 
 
-
-
-
-
-
-
-
-
-
-
-
+# PAINEL DE DESEMPENHO (somente admin)
+if st.session_state.get("perfil") == "admin":
+    profiling.registrar("app.execucao", time.perf_counter() - inicio_execucao)
+    with st.sidebar.expander("⏱️ Desempenho"):
+        st.caption(f"Dados compartilhados entre as sessões: {dados.memoria / (1024 * 1024):.1f} MB")
+        st.caption("Esta execução")
+        st.dataframe(
+            pd.DataFrame(profiling.etapas_execucao(), columns=["Etapa", "Segundos"]),
+            use_container_width=True, hide_index=True
+        )
+        st.caption("Acumulado do processo (percentis das medições recentes)")
+        st.dataframe(pd.DataFrame(profiling.resumo()), use_container_width=True, hide_index=True)
+        st.download_button("JSON", profiling.exportar_json(), "desempenho_qoe.json", mime="application/json")
+        st.download_button("Prometheus", profiling.exportar_prometheus(), "desempenho_qoe.prom", mime="text/plain")
+
+    # Linhas da planilha rejeitadas na validação da carga (modules.validation)
+    with st.sidebar.expander("🧪 Qualidade dos dados"):
+        quarentena = dados.quarentena
+        st.caption(f"{len(df)} linhas aceitas, {len(quarentena)} rejeitadas na validação")
+        if observador is not None and observador.ultimo_erro:
+            st.warning(f"A nova versão da planilha não pôde ser carregada (mantida a versão atual): "
+                       f"{observador.ultimo_erro}")
+        if len(quarentena):
+            st.dataframe(resumo_quarentena(quarentena), use_container_width=True, hide_index=True)
+            st.dataframe(quarentena.head(200), use_container_width=True, hide_index=True)
+            st.download_button(
+                "⬇️ Quarentena (CSV)", lambda: quarentena.to_csv(index=False).encode("utf-8"),
+                "quarentena_qoe.csv", mime="text/csv", on_click="ignore"
+            )
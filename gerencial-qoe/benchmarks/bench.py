@@ -0,0 +1,147 @@
+"""
+Benchmark das etapas do Gerencial QOE com dados sintéticos.
+
+Mede separadamente carregamento da planilha, processamento, consolidação,
+métricas, cada gráfico e o PDF, para vários tamanhos, e grava o resultado
+em JSON para comparar entre commits:
+
+    python benchmarks/bench.py --linhas 10000 100000 --saida base.json
+    python benchmarks/bench.py --linhas 10000 100000 --saida novo.json --comparar base.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+from modules.charts import (
+    contar_evolucao, figura_acoes_por_cidade, figura_evolucao_nodes, figura_motivos
+)
+from modules.consolidation import consolidar_nodes
+from modules.cube import CuboQOE
+from modules.loader import carregar_planilha_local, processar_dataframe
+from modules.metrics import calcular_metricas
+from modules.pdf_export import gerar_pdf_completo
+from synthetic import MAX_LINHAS_EXCEL, gerar_dataframe, gerar_planilha
+
+
+def medir(func, repeticoes):
+    """Menor tempo entre as repetições (s)"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def etapas(df_bruto, caminho_xlsx):
+    """(nome, função) de cada etapa medida"""
+    df = processar_dataframe(df_bruto.copy())
+    cubo = CuboQOE(df)
+    df_nodes = consolidar_nodes(df)
+
+    lista = []
+    if caminho_xlsx:
+        lista.append(("carregar_planilha_local", lambda: carregar_planilha_local(caminho_xlsx)))
+    lista += [
+        ("processar_dataframe", lambda: processar_dataframe(df_bruto.copy())),
+        ("consolidar_nodes", lambda: consolidar_nodes(df)),
+        ("calcular_metricas", lambda: calcular_metricas(df)),
+        ("cubo", lambda: CuboQOE(df)),
+        ("grafico_acoes_por_cidade", lambda: figura_acoes_por_cidade(cubo.acoes_por_cidade())),
+        ("grafico_motivos", lambda: figura_motivos(cubo.contar_motivos())),
+        ("grafico_evolucao_nodes", lambda: figura_evolucao_nodes(contar_evolucao(df_nodes))),
+        ("gerar_pdf_completo", lambda: gerar_pdf_completo(df)),
+    ]
+    return lista
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(resultados, caminho_base):
+    with open(caminho_base, encoding="utf-8") as f:
+        base = {(r["linhas"], r["etapa"]): r["segundos"] for r in json.load(f)["resultados"]}
+
+    print(f"\nComparação com {caminho_base} (razão > 1 = mais lento)")
+    for r in resultados:
+        anterior = base.get((r["linhas"], r["etapa"]))
+        if anterior:
+            print(f"{r['linhas']:>10} {r['etapa']:<26} {r['segundos'] / anterior:>6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--cidades", type=int, default=50)
+    parser.add_argument("--meses", type=int, default=12)
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--motivos", type=int, default=100)
+    parser.add_argument("--assimetria", type=float, default=0.0,
+                        help="expoente Zipf para cidades, nodes e motivos (0 = uniforme)")
+    parser.add_argument("--max-linhas-excel", type=int, default=200_000,
+                        help="acima disso a leitura do .xlsx não é medida (gravar o arquivo é lento)")
+    parser.add_argument("--sem-pdf", action="store_true", help="não mede gerar_pdf_completo")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--saida", default="bench_resultados.json")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    args = parser.parse_args()
+
+    parametros = dict(cidades=args.cidades, meses=args.meses, nodes=args.nodes,
+                      motivos=args.motivos, assimetria=args.assimetria)
+    resultados = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for linhas in args.linhas:
+            caminho_xlsx = None
+            if linhas <= min(args.max_linhas_excel, MAX_LINHAS_EXCEL):
+                caminho_xlsx = os.path.join(tmp, f"qoe_{linhas}.xlsx")
+                df_bruto = gerar_planilha(caminho_xlsx, linhas, **parametros)
+            else:
+                df_bruto = gerar_dataframe(linhas, **parametros)
+
+            for etapa, func in etapas(df_bruto, caminho_xlsx):
+                if etapa == "gerar_pdf_completo" and args.sem_pdf:
+                    continue
+                # Leitura do Excel e PDF são lentos: uma repetição basta
+                repeticoes = 1 if etapa in ("carregar_planilha_local", "gerar_pdf_completo") else args.repeticoes
+                segundos = medir(func, repeticoes)
+                resultados.append({"linhas": linhas, "etapa": etapa, "segundos": round(segundos, 5)})
+                print(f"{linhas:>10} {etapa:<26} {segundos:>9.4f} s")
+
+    saida = {
+        "commit": _commit(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "parametros": parametros,
+        "resultados": resultados,
+    }
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(saida, f, indent=2)
+    print(f"\nResultados gravados em {args.saida}")
+
+    if args.comparar:
+        comparar(resultados, args.comparar)
+
+
+if __name__ == "__main__":
+    main()
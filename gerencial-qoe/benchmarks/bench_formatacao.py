@@ -0,0 +1,82 @@
+"""
+Microbenchmark da classificação e formatação de QOE: caminho escalar
+(apply com uma função Python por valor, como a tabela de registros fazia)
+contra as funções vetorizadas de modules.formatting. Confere também que os
+dois caminhos produzem o mesmo texto.
+
+    python benchmarks/bench_formatacao.py --linhas 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from modules.formatting import classificar, formatar_evolucao, formatar_inteiros, marcar_meta
+
+
+def _classificar_escalar(v):
+    if pd.isna(v): return "—"
+    if v < 40: return "🔴"
+    if v < 80: return "🟡"
+    return "🟢"
+
+
+def escalar(antes, depois):
+    evolucao = depois - antes
+    return {
+        "faixa": depois.apply(_classificar_escalar),
+        "qoe": depois.apply(lambda x: f"{x:.0f}" if pd.notna(x) else "-"),
+        "evolucao": evolucao.apply(
+            lambda x: f"+{x:.0f}" if pd.notna(x) and x > 0 else (f"{x:.0f}" if pd.notna(x) else "-")
+        ),
+        "meta": depois.apply(lambda x: "✅" if pd.notna(x) and x >= 80 else ""),
+    }
+
+
+def vetorizado(antes, depois):
+    return {
+        "faixa": classificar(depois),
+        "qoe": formatar_inteiros(depois),
+        "evolucao": formatar_evolucao(depois - antes),
+        "meta": marcar_meta(depois),
+    }
+
+
+def medir(func, *args, repeticoes=3):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = func(*args)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'linhas':>10} {'escalar (s)':>12} {'vetorizado (s)':>15} {'ganho':>7}")
+    for linhas in args.linhas:
+        antes = pd.Series(rng.uniform(0, 100, linhas).round(1), dtype="float32")
+        depois = pd.Series(rng.uniform(0, 100, linhas).round(1), dtype="float32")
+        antes[rng.random(linhas) < 0.05] = np.nan
+        depois[rng.random(linhas) < 0.05] = np.nan
+
+        t_escalar, esperado = medir(escalar, antes, depois)
+        t_vetorizado, obtido = medir(vetorizado, antes, depois)
+        for nome in esperado:
+            if not np.array_equal(esperado[nome].to_numpy(dtype=object), np.asarray(obtido[nome], dtype=object)):
+                sys.exit(f"Resultado diferente em '{nome}' com {linhas} linhas")
+        print(f"{linhas:>10} {t_escalar:>12.3f} {t_vetorizado:>15.3f} {t_escalar / t_vetorizado:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
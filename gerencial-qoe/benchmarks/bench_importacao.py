@@ -0,0 +1,81 @@
+"""
+Custo de partida do app: tempo até a tela de login em um interpretador
+novo e custo de importação (python -X importtime) de cada módulo carregado
+nessa primeira execução do script.
+
+    python benchmarks/bench_importacao.py --repeticoes 5 --top 15
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT_DIR, "app.py")
+
+# Executado em um processo novo: abre a tela de login (sem sessão autenticada)
+SCRIPT = f"""
+import time
+inicio = time.perf_counter()
+import warnings
+warnings.filterwarnings("ignore")
+from streamlit.testing.v1 import AppTest
+antes_app = time.perf_counter()
+at = AppTest.from_file({APP!r}, default_timeout=300)
+at.run()
+assert not at.exception, at.exception
+print(f"TEMPO {{time.perf_counter() - antes_app:.4f}}")
+"""
+
+LINHA_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def executar(importtime=False):
+    comando = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", SCRIPT]
+    processo = subprocess.run(comando, cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+    tempo = float(re.search(r"TEMPO (\S+)", processo.stdout).group(1))
+    return tempo, processo.stderr
+
+
+def custos_importacao(stderr):
+    """
+    ({módulo: segundos cumulativos} dos imports de primeiro nível,
+    conjunto de todos os módulos importados)
+    """
+    custos = {}
+    importados = set()
+    for linha in stderr.splitlines():
+        encontrado = LINHA_IMPORTTIME.search(linha)
+        if not encontrado:
+            continue
+        _, cumulativo, recuo, modulo = encontrado.groups()
+        importados.add(modulo)
+        if len(recuo) <= 1:
+            custos[modulo] = int(cumulativo) / 1e6
+    return custos, importados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="módulos mais caros listados")
+    args = parser.parse_args()
+
+    tempos = [executar()[0] for _ in range(args.repeticoes)]
+    print(f"Tela de login em processo novo (app.py, sem o import do Streamlit): "
+          f"mínimo {min(tempos):.3f} s, mediana {sorted(tempos)[len(tempos) // 2]:.3f} s")
+
+    _, stderr = executar(importtime=True)
+    custos, importados = custos_importacao(stderr)
+    print(f"\n{'módulo':<40} {'cumulativo (s)':>15}")
+    for modulo, cumulativo in sorted(custos.items(), key=lambda c: -c[1])[:args.top]:
+        print(f"{modulo:<40} {cumulativo:>15.3f}")
+    print()
+    for pesado in ("plotly.express", "reportlab", "modules.pdf_export", "modules.charts", "modules.jobs"):
+        carregado = pesado in importados
+        print(f"{pesado}: {'importado' if carregado else 'não importado'} na tela de login")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Tempo de gerar_pdf_completo conforme cresce o número de cidades e meses,
+comparando o cálculo em uma passada com o cálculo por fatia (um
+calcular_metricas por mês/cidade).
+
+    python benchmarks/bench_pdf.py --linhas 100000 --json resultado.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.loader import processar_dataframe
+from modules.metrics import calcular_metricas
+from modules.pdf_export import gerar_pdf_completo
+from synthetic import gerar_dataframe
+
+
+def medir(func):
+    inicio = time.perf_counter()
+    func()
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--cidades", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--meses", type=int, nargs="+", default=[3, 12, 24])
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    resultados = []
+    print(f"{'cidades':>8} {'meses':>6} {'uma passada (s)':>16} {'por fatia (s)':>14}")
+    for cidades in args.cidades:
+        for meses in args.meses:
+            df = processar_dataframe(gerar_dataframe(args.linhas, cidades=cidades, meses=meses))
+            passada = medir(lambda: gerar_pdf_completo(df))
+            fatia = medir(lambda: gerar_pdf_completo(df, calcular_metricas))
+            resultados.append({
+                "linhas": args.linhas, "cidades": cidades, "meses": meses,
+                "uma_passada_s": round(passada, 4), "por_fatia_s": round(fatia, 4),
+            })
+            print(f"{cidades:>8} {meses:>6} {passada:>16.3f} {fatia:>14.3f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Memória e partida de vários processos do servidor com os mesmos dados: cada
+processo carrega a planilha (com o Parquet ao lado dela já gerado) e
+constrói as estruturas do painel, com e sem QOE_DADOS_COMPARTILHADOS (e com
+o backend SQLite, que também é um arquivo compartilhado). Mede o tempo de carga
+e quanto a memória de cada processo cresce com a carga, pelo PSS (memória
+compartilhada dividida entre os processos que a usam; Linux).
+
+    python benchmarks/bench_processos.py --linhas 500000 --processos 4
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import gerar_planilha
+
+MB = 1024 * 1024
+
+# Executado em cada processo: importa os módulos e converte uma tabela
+# pequena (custos fixos de importação e de inicialização do pyarrow ficam
+# fora da medição), espera o pai medir a memória (uma linha na entrada),
+# carrega os dados, constrói as estruturas e espera a segunda medição
+SCRIPT = f"""
+import io, sys, time
+sys.path.insert(0, {ROOT_DIR!r})
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
+from modules.loader import carregar_dados
+from modules.watcher import preparar_dados
+amostra = pd.DataFrame({{"c": pd.Categorical(["a"]), "x": [1.0], "d": pd.to_datetime(["2026-01-01"])}})
+buffer = io.BytesIO()
+pq.write_table(pa.Table.from_pandas(amostra), buffer)
+pq.read_table(buffer).to_pandas()
+pa.Table.from_pandas(amostra).to_pandas(split_blocks=True)
+print("PRONTO", flush=True)
+sys.stdin.readline()
+inicio = time.perf_counter()
+dados = carregar_dados()
+preparar_dados(dados)
+print(f"TEMPO {{time.perf_counter() - inicio:.4f}}", flush=True)
+sys.stdin.readline()
+"""
+
+
+def _pss(pid):
+    """PSS do processo em bytes (/proc/<pid>/smaps_rollup)"""
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        return int(re.search(r"^Pss:\s+(\d+) kB", f.read(), re.M).group(1)) * 1024
+
+
+def medir(processos, ambiente):
+    """(tempos de carga, aumento do PSS com a carga) de `processos` processos simultâneos"""
+    filhos = [
+        subprocess.Popen([sys.executable, "-c", SCRIPT], cwd=ROOT_DIR, env=ambiente, text=True,
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        for _ in range(processos)
+    ]
+    for filho in filhos:
+        filho.stdout.readline()
+    antes = [_pss(filho.pid) for filho in filhos]
+    for filho in filhos:
+        filho.stdin.write("\n")
+        filho.stdin.flush()
+    tempos = [float(re.search(r"TEMPO (\S+)", filho.stdout.readline()).group(1)) for filho in filhos]
+    depois = [_pss(filho.pid) for filho in filhos]
+    for filho in filhos:
+        filho.communicate("\n")
+    return tempos, [d - a for a, d in zip(antes, depois)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=500_000)
+    parser.add_argument("--processos", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "qoe.xlsx")
+        gerar_planilha(caminho, args.linhas)
+        base = dict(os.environ, QOE_FONTE_DADOS=caminho, QOE_OBSERVAR_DADOS="0")
+        modos = {
+            "cópia por processo": dict(base, QOE_DADOS_COMPARTILHADOS="0"),
+            "Arrow compartilhado": dict(
+                base, QOE_DADOS_COMPARTILHADOS="1",
+                QOE_DIR_DADOS_COMPARTILHADOS=os.path.join(diretorio, "compartilhado"),
+            ),
+            "Arrow compartilhado + SQLite": dict(
+                base, QOE_DADOS_COMPARTILHADOS="1", QOE_BACKEND="sqlite",
+                QOE_DIR_DADOS_COMPARTILHADOS=os.path.join(diretorio, "compartilhado"),
+            ),
+        }
+        for nome, ambiente in modos.items():
+            medir(1, ambiente)  # gera o Parquet, publica o Arrow e grava o SQLite
+            tempos, pss = medir(args.processos, ambiente)
+            print(f"{nome}: carga {min(tempos):.2f}-{max(tempos):.2f} s por processo, "
+                  f"memória dos dados {sum(pss) / MB:.1f} MB no total ({sum(pss) / len(pss) / MB:.1f} MB por processo)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Memória por sessão do app: abre várias sessões do Streamlit no mesmo
+processo (como no servidor), cada uma visitando o Dashboard e a página de
+um setor, e mede quanto a memória cresce por sessão depois da primeira
+(que carrega a planilha e constrói o cubo compartilhado).
+
+    python benchmarks/bench_sessoes.py --linhas 100000 --sessoes 10
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+import warnings
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+from synthetic import gerar_planilha
+
+APP = os.path.join(ROOT_DIR, "app.py")
+MB = 1024 * 1024
+
+
+def _bytes_session_state(at):
+    """Bytes dos DataFrames guardados no session_state da sessão"""
+    total = 0
+    for chave in at.session_state:
+        valor = at.session_state[chave]
+        if isinstance(valor, pd.DataFrame):
+            total += int(valor.memory_usage(deep=True).sum())
+    return total
+
+
+def abrir_sessao():
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=300)
+    at.session_state["perfil"] = "user"
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    setores = [op for op in at.sidebar.radio[0].options if op.startswith("Setor")]
+    if setores:
+        at.sidebar.radio[0].set_value(setores[0]).run()
+    return at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--sessoes", type=int, default=10)
+    parser.add_argument("--json", help="grava o relatório neste arquivo")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "qoe.xlsx")
+        gerar_planilha(caminho, args.linhas)
+        os.environ["QOE_FONTE_DADOS"] = caminho
+        os.environ["QOE_DIR_RELATORIOS"] = os.path.join(diretorio, "relatorios")
+
+        tracemalloc.start()
+        sessoes = [abrir_sessao()]
+        inicial = tracemalloc.get_traced_memory()[0]
+        print(f"primeira sessão (carga + estruturas compartilhadas): {inicial / MB:.1f} MB")
+
+        for _ in range(args.sessoes - 1):
+            sessoes.append(abrir_sessao())
+        final = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+    por_sessao = (final - inicial) / max(1, args.sessoes - 1)
+    relatorio = {
+        "linhas": args.linhas,
+        "sessoes": args.sessoes,
+        "primeira_sessao_mb": round(inicial / MB, 2),
+        "por_sessao_adicional_mb": round(por_sessao / MB, 2),
+        "session_state_dataframes_mb": round(_bytes_session_state(sessoes[-1]) / MB, 2),
+    }
+    print(f"por sessão adicional: {relatorio['por_sessao_adicional_mb']} MB "
+          f"(DataFrames no session_state: {relatorio['session_state_dataframes_mb']} MB)")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
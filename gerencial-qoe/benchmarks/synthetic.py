@@ -0,0 +1,48 @@
+"""Geração de dados QOE sintéticos com o esquema da planilha real."""
+import numpy as np
+import pandas as pd
+
+SETORES = ["MDU", "IAT", "REDE", "DTC"]
+
+# Limite de linhas de uma aba do Excel (incluindo o cabeçalho)
+MAX_LINHAS_EXCEL = 1_048_575
+
+
+def _escolher(rng, valores, linhas, assimetria):
+    """Amostra valores; com assimetria > 0 a frequência segue uma lei de potência (Zipf)"""
+    if assimetria <= 0:
+        return rng.choice(valores, linhas)
+    pesos = 1.0 / np.arange(1, len(valores) + 1) ** assimetria
+    return rng.choice(valores, linhas, p=pesos / pesos.sum())
+
+
+def gerar_dataframe(linhas, cidades=50, meses=12, nodes=5000, motivos=100,
+                    responsaveis=200, assimetria=0.0, semente=0):
+    """
+    DataFrame bruto (como lido do Excel) com as colunas da planilha:
+    SETOR, Cidade, Node, Motivo, QOE ANTES, QOE DEP, Data Execução e Responsável.
+    assimetria concentra ações em poucas cidades, nodes e motivos (0 = uniforme).
+    """
+    rng = np.random.default_rng(semente)
+    inicio = pd.Timestamp("2025-01-01")
+    dias = rng.integers(0, meses * 30, linhas)
+
+    return pd.DataFrame({
+        "Cidade": _escolher(rng, [f"CID{i:03d}" for i in range(cidades)], linhas, assimetria),
+        "Motivo": _escolher(rng, [f"Motivo {i}" for i in range(motivos)], linhas, assimetria),
+        "Node": _escolher(rng, [f"ND{i:05d}-1" for i in range(nodes)], linhas, assimetria),
+        "QOE ANTES": rng.integers(20, 100, linhas).astype(float),
+        "QOE DEP": rng.integers(30, 101, linhas).astype(float),
+        "Data Execução": inicio + pd.to_timedelta(dias, unit="D"),
+        "SETOR": rng.choice(SETORES, linhas),
+        "Responsável": _escolher(rng, [f"Técnico {i}" for i in range(responsaveis)], linhas, assimetria),
+    })
+
+
+def gerar_planilha(caminho, linhas, **kwargs):
+    """Grava uma planilha .xlsx sintética e retorna o DataFrame gravado"""
+    if linhas > MAX_LINHAS_EXCEL:
+        raise ValueError(f"O Excel aceita no máximo {MAX_LINHAS_EXCEL} linhas por aba")
+    df = gerar_dataframe(linhas, **kwargs)
+    df.to_excel(caminho, index=False, sheet_name="Consolidado")
+    return df
@@ -0,0 +1,181 @@
+"""
+Confere a consolidação fora da memória (modules.out_of_core) contra
+consolidar() sobre o DataFrame inteiro: tabela de nodes e KPIs de todas as
+combinações de filtro e políticas, valor a valor, lendo a planilha em
+blocos, o Parquet ao lado dela e um diretório de planilhas (com e sem
+processos).
+
+Cada caminho roda em um processo novo, que mede o tempo e o pico de
+memória residente (VmHWM, que inclui os buffers do pyarrow; Linux) acima
+da memória depois das importações. O caminho em memória equivalente é a
+carga inteira mais o cubo. A ingestão das planilhas do diretório em
+partições, comum aos dois caminhos, é medida à parte.
+
+    python benchmarks/verify_blocos.py --linhas 100000 --bloco 10000
+"""
+import argparse
+import itertools
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.config import LINHAS_BLOCO_EXCEL, TODAS_ABAS
+from modules.consolidation import POLITICAS, consolidar
+from modules.filters import aplicar_filtros
+from synthetic import gerar_dataframe
+
+MB = 1024 * 1024
+
+
+def _memoria(campo):
+    """Campo de /proc/self/status em bytes (VmRSS, VmHWM)"""
+    with open("/proc/self/status") as f:
+        for linha in f:
+            if linha.startswith(campo + ":"):
+                return int(linha.split()[1]) * 1024
+    return 0
+
+
+def _executar(modo, caminho, processos, bloco, saida):
+    """No processo filho: executa um caminho e grava (resultado, segundos, pico) em `saida`"""
+    import io
+
+    import openpyxl  # noqa: F401
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from modules.cube import CuboQOE
+    from modules.loader import carregar_dados
+    from modules.out_of_core import cubo_em_blocos
+
+    # Custos fixos de importação e de inicialização do pyarrow fora da medição
+    amostra = pd.DataFrame({"c": pd.Categorical(["a"]), "x": [1.0], "d": pd.to_datetime(["2026-01-01"])})
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(amostra), buffer)
+    pq.read_table(buffer).to_pandas().groupby("c", observed=True).agg(s=("x", "sum"))
+
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")  # zera o VmHWM: o pico passa a contar só daqui
+    except OSError:
+        pass
+    inicial = _memoria("VmRSS")
+    inicio = time.perf_counter()
+    if modo == "blocos":
+        resultado = cubo_em_blocos(caminho, processos=processos, tamanho_bloco=bloco)
+    else:
+        df = carregar_dados(caminho).df
+        CuboQOE(df)
+        resultado = df
+    segundos = time.perf_counter() - inicio
+    pico = _memoria("VmHWM") - inicial
+    with open(saida, "wb") as f:
+        pickle.dump((resultado, segundos, pico), f)
+
+
+def _medir(modo, caminho, processos, bloco, diretorio):
+    saida = os.path.join(diretorio, "resultado.pkl")
+    subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--executar", modo, caminho, str(processos), str(bloco), saida],
+        cwd=ROOT_DIR, check=True,
+    )
+    with open(saida, "rb") as f:
+        return pickle.load(f)
+
+
+def _selecoes(df, coluna):
+    valores = sorted(df[coluna].dropna().astype(str).unique().tolist())
+    return [None] + [[v] for v in valores[:2]] + ([valores[:2]] if len(valores) > 1 else [])
+
+
+def _nodes(df_nodes):
+    df_nodes = df_nodes.assign(Node=df_nodes["Node"].astype(str))
+    return df_nodes.sort_values("Node").reset_index(drop=True)
+
+
+def comparar(df, cubo, rotulo):
+    divergencias = []
+    combinacoes = itertools.product(_selecoes(df, "SETOR"), _selecoes(df, "Mes"), _selecoes(df, "Cidade"))
+    for (setor, meses, cidades), politica in itertools.product(combinacoes, POLITICAS):
+        esperado_nodes, esperado_kpis = consolidar(aplicar_filtros(df, setor=setor, cidade=cidades, mes=meses), politica)
+        obtido_nodes, obtido_kpis = cubo.consolidar(setor, meses, cidades, politica)
+        filtro = f"{rotulo} setor={setor} meses={meses} cidades={cidades} {politica}"
+        if esperado_kpis != obtido_kpis:
+            divergencias.append(f"{filtro} KPIs: {esperado_kpis} != {obtido_kpis}")
+        try:
+            pd.testing.assert_frame_equal(
+                _nodes(esperado_nodes), _nodes(obtido_nodes)[list(esperado_nodes.columns)], check_exact=True
+            )
+        except AssertionError as e:
+            divergencias.append(f"{filtro} nodes: {str(e).splitlines()[0]}")
+    return divergencias
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--executar":
+        modo, caminho, processos, bloco, saida = sys.argv[2:]
+        _executar(modo, caminho, int(processos), int(bloco), saida)
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--bloco", type=int, default=LINHAS_BLOCO_EXCEL, help="linhas por bloco")
+    parser.add_argument("--processos", type=int, default=4)
+    args = parser.parse_args()
+
+    bruto = gerar_dataframe(args.linhas)
+    # QOE ausente em parte das ações, como na planilha real ("ATUALIZANDO")
+    rng = np.random.default_rng(1)
+    for col in ("QOE ANTES", "QOE DEP"):
+        bruto.loc[rng.random(len(bruto)) < 0.05, col] = np.nan
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        planilha = os.path.join(diretorio, "qoe.xlsx")
+        bruto.to_excel(planilha, index=False)
+        historico = os.path.join(diretorio, "historico")
+        os.makedirs(historico)
+        for i, parte in enumerate(np.array_split(np.arange(len(bruto)), 3)):
+            bruto.iloc[parte].to_excel(os.path.join(historico, f"parte_{i}.xlsx"), index=False)
+
+        from modules.source import FontePlanilhas
+
+        inicio = time.perf_counter()
+        FontePlanilhas(historico, todas_abas=TODAS_ABAS).sincronizar()
+        print(f"ingestão do diretório em partições: {time.perf_counter() - inicio:.2f} s")
+
+        caminhos = [
+            ("planilha em blocos", planilha, 1),
+            ("Parquet ao lado da planilha", planilha, 1),
+            ("diretório", historico, 1),
+            (f"diretório, {args.processos} processos", historico, args.processos),
+        ]
+        divergencias = []
+        carregados = {}
+        for rotulo, caminho, processos in caminhos:
+            cubo, segundos, pico = _medir("blocos", caminho, processos, args.bloco, diretorio)
+            print(f"{rotulo}: fora da memória {segundos:.2f} s, pico {pico / MB:.1f} MB")
+            if caminho not in carregados:
+                # A primeira carga inteira da planilha também grava o Parquet ao lado dela
+                carregados[caminho], segundos, pico = _medir("inteira", caminho, 1, args.bloco, diretorio)
+                print(f"{rotulo}: carga inteira + cubo {segundos:.2f} s, pico {pico / MB:.1f} MB")
+            divergencias += comparar(carregados[caminho], cubo, rotulo)
+
+    for divergencia in divergencias:
+        print(f"DIVERGÊNCIA {divergencia}")
+    if divergencias:
+        sys.exit(1)
+    print("Resultados idênticos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Confere o backend SQLite contra o cubo em pandas: nodes, KPIs, ações por
+cidade, motivos e registros detalhados para todas as combinações de filtro
+de uma amostra sintética (ou de uma planilha), e mede o tempo de cada um.
+Com --em-blocos, a base é gravada da planilha lida em blocos
+(construir_base_em_blocos), sem o DataFrame inteiro.
+
+    python benchmarks/verify_sql.py --linhas 100000
+    python benchmarks/verify_sql.py --planilha data/Gerencial_QOE.xlsx
+    python benchmarks/verify_sql.py --linhas 100000 --em-blocos
+"""
+import argparse
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.consolidation import POLITICAS
+from modules.cube import CuboQOE
+from modules.filters import IndiceFiltros, aplicar_filtros
+from modules.loader import ler_excel_processado, processar_dataframe
+from modules.sql_backend import BaseSQL, construir_base_em_blocos
+from synthetic import gerar_dataframe
+
+COLUNAS_DETALHE = ["Cidade", "Node", "Motivo", "QOE ANTES", "QOE DEP", "Responsável"]
+
+
+def _selecoes(df, coluna):
+    valores = sorted(df[coluna].dropna().unique().tolist()) if coluna in df.columns else []
+    return [None] + [[v] for v in valores[:2]] + ([valores[:2]] if len(valores) > 1 else [])
+
+
+def _normalizar(df):
+    """Tipos comparáveis entre os dois caminhos (category/str -> str, números -> float)"""
+    df = df.reset_index(drop=True).copy()
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]):
+            df[col] = df[col].astype("float64")
+        elif not pd.api.types.is_bool_dtype(df[col]):
+            df[col] = df[col].astype("object").where(df[col].notna(), None).map(
+                lambda v: None if v is None else str(v))
+    return df
+
+
+def _comparar(nome, esperado, obtido, divergencias):
+    if esperado.empty and obtido.empty:
+        # Resultado vazio do SQLite não tem tipos; basta conferir as colunas
+        if list(esperado.columns) != list(obtido.columns):
+            divergencias.append(f"{nome}: colunas {list(esperado.columns)} != {list(obtido.columns)}")
+        return
+    try:
+        pd.testing.assert_frame_equal(_normalizar(esperado), _normalizar(obtido), check_exact=False, rtol=1e-9)
+    except AssertionError as e:
+        divergencias.append(f"{nome}: {str(e).splitlines()[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--planilha", help="usa esta planilha em vez de dados sintéticos")
+    parser.add_argument("--em-blocos", action="store_true", help="grava a base da planilha lida em blocos")
+    parser.add_argument("--bloco", type=int, help="linhas por bloco (com --em-blocos)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        planilha = args.planilha
+        if planilha:
+            df, _ = ler_excel_processado(planilha)
+        else:
+            bruto = gerar_dataframe(args.linhas)
+            # QOE ausente em parte das ações, como na planilha real ("ATUALIZANDO")
+            rng = np.random.default_rng(1)
+            for col in ("QOE ANTES", "QOE DEP"):
+                bruto.loc[rng.random(len(bruto)) < 0.05, col] = np.nan
+            if args.em_blocos:
+                planilha = os.path.join(diretorio, "qoe.xlsx")
+                bruto.to_excel(planilha, index=False)
+                df, _ = ler_excel_processado(planilha)
+            else:
+                df = processar_dataframe(bruto)
+
+        cubo = CuboQOE(df)
+        indice = IndiceFiltros(df)
+        inicio = time.perf_counter()
+        destino = os.path.join(diretorio, "qoe.sqlite")
+        if args.em_blocos:
+            base = construir_base_em_blocos(planilha, destino=destino, tamanho_bloco=args.bloco)
+        else:
+            base = BaseSQL(destino, df, versao="verificacao")
+        print(f"SQLite gravado em {time.perf_counter() - inicio:.2f} s ({len(df)} linhas)")
+
+        tempos = {"pandas": 0.0, "sqlite": 0.0}
+        divergencias = []
+        combinacoes = list(itertools.product(_selecoes(df, "SETOR"), _selecoes(df, "Mes"), _selecoes(df, "Cidade")))
+        for setor, meses, cidades in combinacoes:
+            rotulo = f"setor={setor} meses={meses} cidades={cidades}"
+            for fonte, consulta in (("pandas", cubo), ("sqlite", base)):
+                inicio = time.perf_counter()
+                resultado = {
+                    politica: consulta.consolidar(setor, meses, cidades, politica) for politica in POLITICAS
+                }
+                resultado["cidades"] = consulta.acoes_por_cidade(setor, meses, cidades)
+                resultado["motivos"] = consulta.contar_motivos(setor, meses, cidades)
+                if fonte == "pandas":
+                    linhas = aplicar_filtros(df, setor=setor, cidade=cidades, mes=meses, indice=indice)
+                    resultado["linhas"] = linhas[[c for c in COLUNAS_DETALHE if c in df.columns]]
+                else:
+                    resultado["linhas"] = consulta.linhas(setor, meses, cidades, colunas=COLUNAS_DETALHE)
+                tempos[fonte] += time.perf_counter() - inicio
+                if fonte == "pandas":
+                    esperado = resultado
+
+            for politica in POLITICAS:
+                nodes_esperado, kpis_esperado = esperado[politica]
+                nodes_obtido, kpis_obtido = resultado[politica]
+                _comparar(f"{rotulo} {politica} nodes", nodes_esperado, nodes_obtido, divergencias)
+                if kpis_esperado != kpis_obtido:
+                    divergencias.append(f"{rotulo} {politica} KPIs: {kpis_esperado} != {kpis_obtido}")
+            for parte in ("cidades", "motivos", "linhas"):
+                _comparar(f"{rotulo} {parte}", esperado[parte], resultado[parte], divergencias)
+
+        print(f"{len(combinacoes)} combinações de filtro: "
+              f"pandas {tempos['pandas']:.2f} s, sqlite {tempos['sqlite']:.2f} s")
+        for divergencia in divergencias:
+            print(f"DIVERGÊNCIA {divergencia}")
+        if divergencias:
+            sys.exit(1)
+        print("Resultados idênticos")
+
+
+if __name__ == "__main__":
+    main()
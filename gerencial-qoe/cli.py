@@ -0,0 +1,184 @@
+"""
+Gerencial QOE em linha de comando, sem Streamlit.
+
+Exemplos:
+    python cli.py kpis --formato csv --saida kpis.csv
+    python cli.py kpis --setor MDU --mes 2025-12 --cidade POA
+    python cli.py kpis --todos-setores planilhas/*.xlsx --processos 4
+    python cli.py kpis historico/ --mes 2025-12
+    python cli.py kpis historico/ --em-blocos --todos-setores
+    python cli.py pdf --todos-setores --saida relatorios/
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+
+from modules.consolidation import consolidar
+from modules.config import FONTE_DADOS, TODAS_ABAS
+from modules.filters import aplicar_filtros
+from modules.loader import caminho_planilha, carregar_dados
+
+CAMPOS_FILTRO = ["planilha", "setor", "mes", "cidade"]
+
+
+def _rotulo(valores):
+    return "+".join(valores) if valores else "Todos"
+
+
+def _selecoes(setores_dados, args):
+    """(setor, mes, cidade) de cada relatório pedido"""
+    if args.todos_setores:
+        setores = [None] + [[s] for s in setores_dados]
+    else:
+        setores = [args.setor]
+    return [(setor, args.mes, args.cidade) for setor in setores]
+
+
+def _ler(caminho, meses):
+    """
+    DataFrame processado de uma planilha ou de um diretório de planilhas;
+    de um diretório, com --mes, lê apenas as partições desses meses
+    """
+    if os.path.isdir(caminho):
+        from modules.source import FontePlanilhas
+
+        fonte = FontePlanilhas(caminho, todas_abas=TODAS_ABAS)
+        if not fonte.planilhas():
+            raise FileNotFoundError(f"Nenhuma planilha .xlsx em: {caminho}")
+        fonte.sincronizar()
+        return fonte.ler(meses)
+
+    dados = carregar_dados(caminho)
+    if dados is None:
+        raise FileNotFoundError(f"Planilha não encontrada: {caminho}")
+    return dados.df
+
+
+def _kpis_em_blocos(caminho, nome, args):
+    """
+    KPIs pelo caminho fora da memória (modules.out_of_core): a planilha é
+    lida em blocos e só o cubo de agregados fica em memória
+    """
+    from modules.out_of_core import cubo_em_blocos
+
+    if not os.path.exists(caminho):
+        raise FileNotFoundError(f"Planilha não encontrada: {caminho}")
+    cubo = cubo_em_blocos(caminho, meses=args.mes, processos=args.processos_blocos)
+    if cubo is None:
+        raise ValueError(f"Nenhuma ação em: {caminho}")
+
+    setores = sorted(cubo.celulas["SETOR"].dropna().astype(str).unique()) if "SETOR" in cubo.celulas else []
+    linhas = []
+    for setor, mes, cidade in _selecoes(setores, args):
+        _, kpis = cubo.consolidar(setor, mes, cidade)
+        linha = {"planilha": nome, "setor": _rotulo(setor), "mes": _rotulo(mes), "cidade": _rotulo(cidade)}
+        linha.update(kpis)
+        linhas.append(linha)
+    return linhas
+
+
+def processar_planilha(caminho, args):
+    """KPIs (e PDFs, no comando pdf) de uma planilha; retorna uma linha por seleção"""
+    nome = os.path.splitext(os.path.basename(os.path.normpath(caminho)))[0]
+    if getattr(args, "em_blocos", False):
+        return _kpis_em_blocos(caminho, nome, args)
+
+    df = _ler(caminho, args.mes)
+    linhas = []
+    for setor, mes, cidade in _selecoes(sorted(df["SETOR"].dropna().astype(str).unique()), args):
+        df_filtrado = aplicar_filtros(df, setor=setor, cidade=cidade, mes=mes)
+        _, kpis = consolidar(df_filtrado)
+        linha = {"planilha": nome, "setor": _rotulo(setor), "mes": _rotulo(mes), "cidade": _rotulo(cidade)}
+        linha.update(kpis)
+
+        if args.comando == "pdf":
+            from modules.pdf_export import gerar_pdf_completo
+
+            partes = [nome] + [linha[c] for c in CAMPOS_FILTRO[1:] if linha[c] != "Todos"]
+            arquivo = os.path.join(args.saida, "_".join(partes) + ".pdf")
+            with open(arquivo, "wb") as f:
+                f.write(gerar_pdf_completo(df_filtrado).getvalue())
+            linha["arquivo"] = arquivo
+
+        linhas.append(linha)
+    return linhas
+
+
+def _executar(planilhas, args):
+    if args.processos <= 1 or len(planilhas) <= 1:
+        return [linha for caminho in planilhas for linha in processar_planilha(caminho, args)]
+
+    with ProcessPoolExecutor(max_workers=args.processos) as executor:
+        resultados = executor.map(processar_planilha, planilhas, [args] * len(planilhas))
+        return [linha for linhas in resultados for linha in linhas]
+
+
+def _escrever(linhas, formato, saida):
+    destino = open(saida, "w", encoding="utf-8", newline="") if saida else sys.stdout
+    try:
+        if formato == "csv":
+            campos = list(dict.fromkeys(c for linha in linhas for c in linha))
+            writer = csv.DictWriter(destino, fieldnames=campos)
+            writer.writeheader()
+            writer.writerows(linhas)
+        else:
+            json.dump(linhas, destino, ensure_ascii=False, indent=2)
+            destino.write("\n")
+    finally:
+        if saida:
+            destino.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gerencial QOE sem Streamlit: KPIs e relatórios PDF")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    for nome, ajuda in (("kpis", "KPIs em JSON ou CSV"), ("pdf", "relatórios PDF")):
+        p = sub.add_parser(nome, help=ajuda)
+        p.add_argument("planilhas", nargs="*", help="planilhas .xlsx ou diretórios de planilhas (padrão: data/Gerencial_QOE.xlsx)")
+        p.add_argument("--setor", action="append", help="filtra por setor (pode repetir)")
+        p.add_argument("--mes", action="append", help="filtra por mês AAAA-MM (pode repetir)")
+        p.add_argument("--cidade", action="append", help="filtra por cidade (pode repetir)")
+        p.add_argument("--todos-setores", action="store_true", help="um resultado geral e um por setor")
+        p.add_argument("--processos", type=int, default=os.cpu_count() or 1,
+                       help="planilhas processadas em paralelo")
+        if nome == "kpis":
+            p.add_argument("--formato", choices=["json", "csv"], default="json")
+            p.add_argument("--saida", help="arquivo de saída (padrão: stdout)")
+            p.add_argument("--em-blocos", action="store_true",
+                           help="agrega a planilha em blocos, sem carregá-la inteira (históricos maiores que a RAM)")
+        else:
+            p.add_argument("--saida", default=".", help="diretório dos PDFs")
+
+    args = parser.parse_args(argv)
+    # Filtros são comparados com os valores normalizados no carregamento
+    for campo in ("setor", "cidade", "mes"):
+        valores = getattr(args, campo)
+        if valores:
+            setattr(args, campo, [v.strip().upper() for v in valores])
+
+    planilhas = args.planilhas or [FONTE_DADOS or caminho_planilha()]
+    # Com uma fonte só, os processos agregam as partes dela em paralelo
+    args.processos_blocos = args.processos if len(planilhas) == 1 else 1
+    if args.comando == "pdf":
+        os.makedirs(args.saida, exist_ok=True)
+
+    try:
+        linhas = _executar(planilhas, args)
+    except (FileNotFoundError, ValueError) as e:
+        parser.exit(1, f"Erro: {e}\n")
+
+    if args.comando == "kpis":
+        _escrever(linhas, args.formato, args.saida)
+    else:
+        _escrever([{c: linha[c] for c in CAMPOS_FILTRO + ["arquivo"]} for linha in linhas], "json", None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import pandas as pd
+
+from modules.filters import normalizar_selecao
+from modules.profiling import instrumentar
+
+DIMENSOES = ["SETOR", "Mes", "Cidade", "Node"]
+# Dimensões dos filtros dependentes (combinações guardadas com a contagem de ações)
+DIMENSOES_FILTRO = ["SETOR", "Mes", "Cidade"]
+
+ROTULOS_SETOR = {"IAT": "IaT", "MDU": "MDU", "DTC": "DTC", "REDE": "Rede"}
+
+
+def formatar_setor_label(up: str) -> str:
+    """Nome do setor para o menu (ex.: IAT -> IaT, REDE -> Rede)"""
+    if up in ROTULOS_SETOR:
+        return ROTULOS_SETOR[up]
+    return up.capitalize()
+
+
+class CatalogoDimensoes:
+    """
+    Valores distintos de cada dimensão (setores com o rótulo do menu,
+    meses, cidades e nodes), com o número de ações de cada um, construído
+    uma vez por versão dos dados.
+
+    Guarda também as combinações (SETOR, Mes, Cidade) existentes, que
+    respondem aos filtros dependentes (ex.: cidades com ações no mês e
+    setor selecionados) sem voltar às linhas.
+    """
+
+    @instrumentar("catalog.construir")
+    def __init__(self, df):
+        self.contagens = {}
+        for col in DIMENSOES:
+            if col in df.columns:
+                contagem = df[col].value_counts(sort=False)
+                self.contagens[col] = contagem[contagem > 0].sort_index()
+
+        self.setores = {}  # rótulo -> valor normalizado
+        for valor in self.valores("SETOR"):
+            self.setores[formatar_setor_label(valor)] = valor
+
+        chaves = [col for col in DIMENSOES_FILTRO if col in df.columns]
+        self.combinacoes = (
+            df.groupby(chaves, observed=True, dropna=False).size().reset_index(name="acoes")
+            if chaves else pd.DataFrame(columns=["acoes"])
+        )
+
+    def valores(self, coluna):
+        """Valores distintos da coluna, em ordem (lista vazia se a coluna não existe)"""
+        contagem = self.contagens.get(coluna)
+        return [] if contagem is None else [str(v) for v in contagem.index]
+
+    def rotulos_setores(self):
+        """Rótulos do menu, em ordem alfabética"""
+        return sorted(self.setores, key=lambda rotulo: rotulo.upper())
+
+    @instrumentar("catalog.opcoes")
+    def opcoes(self, coluna, setor=None, mes=None, cidade=None):
+        """
+        Valores de `coluna` que têm ações com os demais filtros (cada um
+        None, um valor ou uma lista), em ordem
+        """
+        if coluna not in self.combinacoes.columns:
+            return []
+        linhas = self.combinacoes
+        for col, valores in (("SETOR", setor), ("Mes", mes), ("Cidade", cidade)):
+            valores = normalizar_selecao(valores)
+            if valores is None or col == coluna:
+                continue
+            if col not in linhas.columns:
+                return []
+            linhas = linhas[linhas[col].isin(valores)]
+        return sorted(str(v) for v in linhas[coluna].dropna().unique())
+
+
+def obter_catalogo(dados):
+    """Catálogo de dimensões da versão carregada (construído na primeira chamada)"""
+    return dados.derivado("catalogo", CatalogoDimensoes)
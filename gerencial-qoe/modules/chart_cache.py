@@ -0,0 +1,95 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from modules.config import CACHE_FIGURAS_MB
+from modules.profiling import instrumentar
+
+
+def _tamanho(dados):
+    if isinstance(dados, pd.DataFrame):
+        return int(dados.memory_usage(deep=True).sum())
+    return sys.getsizeof(dados)
+
+
+class CacheFiguras:
+    """
+    Cache LRU de gráficos, limitado pelo tamanho em bytes.
+    Cada item guarda os dados agregados e a figura serializada em JSON.
+    """
+
+    def __init__(self, orcamento_bytes):
+        self.orcamento_bytes = orcamento_bytes
+        self._itens = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def obter(self, chave):
+        """(dados, figura_json) ou None"""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self.misses += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.hits += 1
+            return item[0], item[1]
+
+    def guardar(self, chave, dados, figura_json):
+        tamanho = _tamanho(dados) + len(figura_json or "")
+        with self._lock:
+            if chave in self._itens:
+                self._bytes -= self._itens.pop(chave)[2]
+            if tamanho > self.orcamento_bytes:
+                return
+            self._itens[chave] = (dados, figura_json, tamanho)
+            self._bytes += tamanho
+            while self._bytes > self.orcamento_bytes:
+                _, (_, _, liberado) = self._itens.popitem(last=False)
+                self._bytes -= liberado
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "itens": len(self._itens),
+                "bytes": self._bytes,
+                "orcamento_bytes": self.orcamento_bytes,
+            }
+
+
+# Cache do processo, compartilhado entre sessões
+cache_figuras = CacheFiguras(CACHE_FIGURAS_MB * 1024 * 1024)
+
+
+@instrumentar("chart_cache.figura_em_cache")
+def figura_em_cache(versao, id_grafico, filtros, agregar, construir):
+    """
+    Figura Plotly do gráfico id_grafico para (versão dos dados, filtros).
+
+    Na primeira chamada executa agregar() e construir(dados), que pode
+    retornar None quando não há dados; nas seguintes a figura é recriada a
+    partir do JSON guardado, sem refazer a agregação nem a montagem.
+    """
+    chave = (versao, id_grafico, tuple(filtros))
+    item = cache_figuras.obter(chave)
+    if item is None:
+        dados = agregar()
+        fig = construir(dados)
+        cache_figuras.guardar(chave, dados, fig.to_json() if fig is not None else None)
+        return fig
+
+    import plotly.io as pio
+
+    _, figura_json = item
+    return pio.from_json(figura_json) if figura_json is not None else None
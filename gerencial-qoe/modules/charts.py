@@ -3,13 +3,25 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
-def grafico_acoes_por_cidade(df):
-    """Gráfico de barras horizontal com ações por cidade, ordenado do maior para o menor, com rótulos"""
-    if "Cidade" not in df.columns or len(df) == 0:
+from modules.profiling import instrumentar
+
+@instrumentar("charts.exibir_figura")
+def exibir_figura(fig):
+    """Exibe a figura, ou um aviso quando não há dados (fig None)"""
+    if fig is None:
         st.info("Não há dados para exibir")
         return
+    st.plotly_chart(fig, use_container_width=True)
+
+@instrumentar("charts.figura_acoes_por_cidade")
+def figura_acoes_por_cidade(df_agrupado):
+    """
+    Gráfico de barras horizontal com ações por cidade, ordenado do maior para o menor, com rótulos.
+    Recebe as contagens já agregadas (colunas Cidade, Ações), ex.: CuboQOE.acoes_por_cidade.
+    """
+    if len(df_agrupado) == 0:
+        return None
     
-    df_agrupado = df.groupby("Cidade").size().reset_index(name="Ações")
     df_agrupado = df_agrupado.sort_values("Ações", ascending=False)  # Ordena do maior para o menor
     
     fig = px.bar(
@@ -25,15 +37,20 @@ def grafico_acoes_por_cidade(df):
     )
     fig.update_traces(texttemplate='%{text}', textposition='outside')
     fig.update_layout(showlegend=False, height=300, yaxis={'categoryorder': 'total descending'})
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-def grafico_motivos(df):
-    """Gráfico de colunas com top 10 motivos, mostrando total e porcentagem"""
-    if "Motivo" not in df.columns or len(df) == 0:
-        st.info("Não há dados para exibir")
-        return
+def grafico_acoes_por_cidade(df_agrupado):
+    exibir_figura(figura_acoes_por_cidade(df_agrupado))
+
+@instrumentar("charts.figura_motivos")
+def figura_motivos(df_agrupado):
+    """
+    Gráfico de colunas com top 10 motivos, mostrando total e porcentagem.
+    Recebe as contagens já agregadas (colunas Motivo, Quantidade), ex.: CuboQOE.contar_motivos.
+    """
+    if len(df_agrupado) == 0:
+        return None
     
-    df_agrupado = df.groupby("Motivo").size().reset_index(name="Quantidade")
     df_agrupado = df_agrupado.sort_values("Quantidade", ascending=False)
     
     # Pega apenas os top 10
@@ -65,35 +82,28 @@ def grafico_motivos(df):
         showlegend=False
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-def grafico_evolucao_nodes(df):
-    """Gráfico donut mostrando evolução dos nodes (Melhoraram, Pioraram, Mantiveram) com rótulos"""
-    if "Node" not in df.columns or len(df) == 0:
-        st.info("Não há dados para exibir")
-        return
-    
-    # Converte QOE para numérico
-    df_calc = df.copy()
-    df_calc["QOE ANTES"] = pd.to_numeric(df_calc["QOE ANTES"], errors="coerce")
-    df_calc["QOE DEP"] = pd.to_numeric(df_calc["QOE DEP"], errors="coerce")
-    df_calc = df_calc.dropna(subset=["QOE ANTES", "QOE DEP"])
-    
-    if len(df_calc) == 0:
-        st.info("Não há dados válidos para exibir")
-        return
-    
-    # Agrupa por Node e calcula evolução
-    node = df_calc.groupby("Node").agg({
-        "QOE ANTES": "mean",
-        "QOE DEP": "mean"
-    }).reset_index()
-    
-    node["Evolucao"] = node["QOE DEP"] - node["QOE ANTES"]
-    
-    melhoraram = (node["Evolucao"] > 0).sum()
-    pioraram = (node["Evolucao"] < 0).sum()
-    mantiveram = (node["Evolucao"] == 0).sum()
+def grafico_motivos(df_agrupado):
+    exibir_figura(figura_motivos(df_agrupado))
+
+def contar_evolucao(df_nodes):
+    """Quantidade de nodes que melhoraram, pioraram e mantiveram, da tabela de modules.consolidation"""
+    return {
+        "melhoraram": int(df_nodes["Melhorou"].sum()),
+        "pioraram": int(df_nodes["Piorou"].sum()),
+        "mantiveram": int(df_nodes["Manteve"].sum())
+    }
+
+@instrumentar("charts.figura_evolucao_nodes")
+def figura_evolucao_nodes(contagens):
+    """
+    Gráfico donut mostrando evolução dos nodes (Melhoraram, Pioraram, Mantiveram) com rótulos.
+    Recebe as contagens de contar_evolucao.
+    """
+    melhoraram = contagens["melhoraram"]
+    pioraram = contagens["pioraram"]
+    mantiveram = contagens["mantiveram"]
     
     labels = []
     values = []
@@ -122,8 +132,7 @@ def grafico_evolucao_nodes(df):
         text_labels.append(f"Mantiveram<br>{mantiveram} ({percent}%)")
     
     if len(values) == 0:
-        st.info("Não há dados para exibir")
-        return
+        return None
     
     fig = go.Figure(data=[go.Pie(
         labels=text_labels,
@@ -148,4 +157,7 @@ def grafico_evolucao_nodes(df):
         )
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+def grafico_evolucao_nodes(df_nodes):
+    exibir_figura(figura_evolucao_nodes(contar_evolucao(df_nodes)))
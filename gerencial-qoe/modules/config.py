@@ -0,0 +1,67 @@
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env_int(nome, padrao):
+    valor = os.environ.get(nome)
+    if valor is None or valor.strip() == "":
+        return padrao
+    try:
+        return int(valor)
+    except ValueError:
+        raise ValueError(f"Variável de ambiente {nome} deve ser um número inteiro: {valor!r}")
+
+
+# Faixas de classificação do QOE: 🔴 abaixo do crítico, 🟡 até o bom, 🟢 a partir do bom.
+# Só mudam as cores: a meta dos KPIs e da coluna ">= 80" (consolidation.LIMIAR_QOE) é fixa
+LIMIAR_QOE_CRITICO = _env_int("QOE_LIMIAR_CRITICO", 40)
+LIMIAR_QOE_BOM = _env_int("QOE_LIMIAR_BOM", 80)
+
+# Memória máxima do cache de figuras dos gráficos (MB)
+CACHE_FIGURAS_MB = _env_int("QOE_CACHE_FIGURAS_MB", 64)
+
+# Relatórios gerados em segundo plano, reaproveitados enquanto a planilha não muda
+DIR_RELATORIOS = os.environ.get("QOE_DIR_RELATORIOS") or os.path.join(ROOT_DIR, "data", "relatorios")
+TRABALHOS_RELATORIO_SIMULTANEOS = _env_int("QOE_TRABALHOS_RELATORIO", 1)
+
+# Instrumentação: quantas medições recentes por etapa entram nos percentis
+PERFIL_JANELA = _env_int("QOE_PERFIL_JANELA", 512)
+# Mede também o pico de memória alocada por etapa (tracemalloc; deixa tudo mais lento
+# e, com várias sessões ao mesmo tempo, os valores são aproximados)
+PERFIL_MEMORIA = _env_int("QOE_PERFIL_MEMORIA", 0) == 1
+
+# Planilha que só ganhou linhas no final: processa apenas as novas (0 = sempre tudo)
+INGESTAO_INCREMENTAL = _env_int("QOE_INGESTAO_INCREMENTAL", 1) == 1
+
+# Leitura do Excel em blocos de linhas (a memória de pico acompanha o bloco)
+# e processos usados para ler em paralelo as abas de uma planilha (0 = um por CPU)
+LINHAS_BLOCO_EXCEL = _env_int("QOE_LINHAS_BLOCO_EXCEL", 50_000)
+PROCESSOS_ABAS = _env_int("QOE_PROCESSOS_ABAS", 0) or (os.cpu_count() or 1)
+
+# Observador da fonte dos dados: verifica a planilha a cada INTERVALO segundos e carrega
+# as versões novas em segundo plano, depois de ESTABILIDADE segundos sem mudança (0 = desliga;
+# a primeira requisição depois da troca da planilha faz a leitura)
+OBSERVAR_DADOS = _env_int("QOE_OBSERVAR_DADOS", 1) == 1
+INTERVALO_OBSERVADOR_S = _env_int("QOE_INTERVALO_OBSERVADOR_S", 2)
+ESTABILIDADE_DADOS_S = _env_int("QOE_ESTABILIDADE_DADOS_S", 3)
+
+# Fonte dos dados: uma planilha ou um diretório com uma planilha por mês
+# (padrão: data/Gerencial_QOE.xlsx). Diretórios, e planilhas lidas com todas
+# as abas, são guardados em Parquet particionado por Mes
+FONTE_DADOS = os.environ.get("QOE_FONTE_DADOS") or None
+TODAS_ABAS = _env_int("QOE_TODAS_ABAS", 0) == 1
+
+# Vários processos do servidor: a versão dos dados é lida por um deles e publicada como
+# arquivo Arrow no diretório abaixo, que todos mapeiam em memória em vez de cada um
+# ter a sua cópia
+DADOS_COMPARTILHADOS = _env_int("QOE_DADOS_COMPARTILHADOS", 0) == 1
+DIR_DADOS_COMPARTILHADOS = (
+    os.environ.get("QOE_DIR_DADOS_COMPARTILHADOS") or os.path.join(ROOT_DIR, "data", "_compartilhado")
+)
+
+# Consultas do dashboard: "pandas" (cubo em memória) ou "sqlite" (arquivo SQLite
+# com índices, compartilhado entre processos)
+BACKEND_CONSULTAS = (os.environ.get("QOE_BACKEND") or "pandas").strip().lower()
+if BACKEND_CONSULTAS not in ("pandas", "sqlite"):
+    raise ValueError(f"Variável de ambiente QOE_BACKEND deve ser 'pandas' ou 'sqlite': {BACKEND_CONSULTAS!r}")
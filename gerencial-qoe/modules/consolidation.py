@@ -0,0 +1,124 @@
+import pandas as pd
+
+from modules.profiling import instrumentar
+
+# Políticas de agregação das ações de um mesmo Node
+POLITICAS = {
+    # Metodologia oficial: média das ações antes, melhor valor depois
+    "gerencial": {"QOE ANTES": "mean", "QOE DEP": "max"},
+    # Média simples antes e depois
+    "media": {"QOE ANTES": "mean", "QOE DEP": "mean"},
+}
+POLITICA_PADRAO = "gerencial"
+
+LIMIAR_QOE = 80
+
+KPIS_VAZIOS = {
+    "total_nodes": 0,
+    "acoes": 0,
+    "qoe_antes": 0,
+    "qoe_depois": 0,
+    "melhoraram": 0,
+    "pioraram": 0,
+    "mantiveram": 0,
+    "nodes_80": 0,
+    "atingiram_80": 0,
+    "perc_atingiram_80": 0,
+    "perc_total_80": 0
+}
+
+
+@instrumentar("consolidation.consolidar_nodes")
+def consolidar_nodes(df, politica=POLITICA_PADRAO):
+    """
+    Consolida as ações por NODE (valor absoluto) em um único groupby.
+    A política define como QOE ANTES e QOE DEP de cada node são agregados.
+    """
+    regras = POLITICAS[politica]
+    # QOE é float32 no DataFrame; médias em float64, como nas somas do cubo
+    df = df.astype({"QOE ANTES": "float64", "QOE DEP": "float64"})
+
+    if "Node" in df.columns:
+        df_nodes = df.groupby("Node", as_index=False, observed=True).agg(regras)
+    else:
+        # Sem coluna Node, todas as ações formam um único grupo
+        df_nodes = pd.DataFrame({"Node": ["Todos"]})
+        for col, func in regras.items():
+            df_nodes[col] = [df[col].agg(func)]
+
+    return marcar_evolucao(df_nodes)
+
+
+def marcar_evolucao(df_nodes):
+    """Adiciona as colunas de evolução e limiar à tabela de nodes"""
+    antes = df_nodes["QOE ANTES"]
+    depois = df_nodes["QOE DEP"]
+    df_nodes["Melhorou"] = depois > antes
+    df_nodes["Piorou"] = depois < antes
+    df_nodes["Manteve"] = depois == antes
+    df_nodes["Atingiu_80"] = depois >= LIMIAR_QOE
+    df_nodes["Atingiu_80_pos"] = (antes < LIMIAR_QOE) & (depois >= LIMIAR_QOE)
+    return df_nodes
+
+
+def _media(serie):
+    media = serie.mean()
+    return round(float(media), 1) if pd.notna(media) else 0
+
+
+def calcular_kpis(df_nodes, acoes):
+    """KPIs do painel a partir da tabela de nodes consolidada"""
+    total_nodes = len(df_nodes)
+    if total_nodes == 0:
+        return dict(KPIS_VAZIOS, acoes=int(acoes))
+
+    atingiram_80 = int(df_nodes["Atingiu_80_pos"].sum())
+    base_abaixo = int((df_nodes["QOE ANTES"] < LIMIAR_QOE).sum())
+    nodes_80 = int(df_nodes["Atingiu_80"].sum())
+
+    return {
+        "total_nodes": total_nodes,
+        "acoes": int(acoes),
+        "qoe_antes": _media(df_nodes["QOE ANTES"]),
+        "qoe_depois": _media(df_nodes["QOE DEP"]),
+        "melhoraram": int(df_nodes["Melhorou"].sum()),
+        "pioraram": int(df_nodes["Piorou"].sum()),
+        "mantiveram": int(df_nodes["Manteve"].sum()),
+        "nodes_80": nodes_80,
+        "atingiram_80": atingiram_80,
+        "perc_atingiram_80": round(atingiram_80 / max(1, base_abaixo) * 100, 1),
+        "perc_total_80": round(nodes_80 / total_nodes * 100, 1)
+    }
+
+
+def consolidar(df, politica=POLITICA_PADRAO):
+    """Tabela de nodes e KPIs das ações em df"""
+    df_nodes = consolidar_nodes(df, politica)
+    return df_nodes, calcular_kpis(df_nodes, len(df))
+
+
+@instrumentar("consolidation.calcular_kpis_por_grupo")
+def calcular_kpis_por_grupo(df, coluna, politica=POLITICA_PADRAO):
+    """
+    KPIs de cada valor de coluna (ex.: Mes, Cidade) em uma única passada:
+    um groupby por (coluna, Node) em vez de filtrar df uma vez por grupo.
+    Retorna {valor: kpis}, na ordem dos valores.
+    """
+    if coluna not in df.columns:
+        return {}
+
+    regras = POLITICAS[politica]
+    chaves = [coluna, "Node"] if "Node" in df.columns else [coluna]
+    # Médias em float64, como em consolidar_nodes: a mesma classificação dos nodes
+    df_qoe = df.astype({"QOE ANTES": "float64", "QOE DEP": "float64"})
+    df_nodes = df_qoe.groupby(chaves, observed=True).agg(regras).reset_index()
+    df_nodes = marcar_evolucao(df_nodes)
+
+    acoes = df.groupby(coluna, observed=True).size()
+    nodes_por_grupo = dict(iter(df_nodes.groupby(coluna, observed=True)))
+    vazio = df_nodes.iloc[0:0]
+
+    return {
+        valor: calcular_kpis(nodes_por_grupo.get(valor, vazio), total)
+        for valor, total in sorted(acoes.items())
+    }
@@ -0,0 +1,188 @@
+import pandas as pd
+
+from modules.consolidation import (
+    POLITICA_PADRAO, POLITICAS, calcular_kpis, marcar_evolucao
+)
+from modules.filters import normalizar_selecao
+from modules.ingest import alinhar_categorias
+from modules.profiling import instrumentar
+
+DIMENSOES = ["SETOR", "Mes", "Cidade", "Node"]
+
+
+def agregar_celulas(df):
+    """
+    (células, motivos) das linhas de ações: somas, contagens e máximos de
+    QOE por (SETOR, Mes, Cidade, Node), e ações por (SETOR, Mes, Cidade,
+    Motivo) (None sem coluna Motivo)
+    """
+    dimensoes = [col for col in DIMENSOES if col in df.columns]
+    base = df[dimensoes].copy()
+    if "Node" not in base.columns:
+        # Sem coluna Node, todas as ações formam um único node
+        base["Node"] = "Todos"
+    # Somas em float64 para não acumular erro do float32
+    base["QOE ANTES"] = df["QOE ANTES"].astype("float64")
+    base["QOE DEP"] = df["QOE DEP"].astype("float64")
+
+    chaves = [col for col in DIMENSOES if col in base.columns]
+    celulas = (
+        base.groupby(chaves, observed=True, dropna=False)
+        .agg(
+            antes_soma=("QOE ANTES", "sum"),
+            antes_cont=("QOE ANTES", "count"),
+            antes_max=("QOE ANTES", "max"),
+            dep_soma=("QOE DEP", "sum"),
+            dep_cont=("QOE DEP", "count"),
+            dep_max=("QOE DEP", "max"),
+            acoes=("QOE ANTES", "size"),
+        )
+        .reset_index()
+    )
+
+    dims_motivo = [col for col in dimensoes if col != "Node"]
+    if "Motivo" not in df.columns:
+        return celulas, None
+    motivos = (
+        df.groupby(dims_motivo + ["Motivo"], observed=True, dropna=False)
+        .size()
+        .reset_index(name="Quantidade")
+    )
+    return celulas, motivos
+
+
+def somar_celulas(lista_celulas):
+    """Células de vários agregados somadas em uma: somas, contagens e ações somadas, máximos pelo maior"""
+    chaves = [col for col in DIMENSOES if col in lista_celulas[0].columns]
+    celulas = pd.concat(alinhar_categorias(lista_celulas, chaves), ignore_index=True)
+    return (
+        celulas.groupby(chaves, observed=True, dropna=False)
+        .agg(
+            antes_soma=("antes_soma", "sum"),
+            antes_cont=("antes_cont", "sum"),
+            antes_max=("antes_max", "max"),
+            dep_soma=("dep_soma", "sum"),
+            dep_cont=("dep_cont", "sum"),
+            dep_max=("dep_max", "max"),
+            acoes=("acoes", "sum"),
+        )
+        .reset_index()
+    )
+
+
+def somar_motivos(lista_motivos):
+    """Contagens de motivos de vários agregados somadas (None se algum não tem motivos)"""
+    if any(motivos is None for motivos in lista_motivos):
+        return None
+    chaves = [col for col in lista_motivos[0].columns if col != "Quantidade"]
+    motivos = pd.concat(alinhar_categorias(lista_motivos, chaves), ignore_index=True)
+    return motivos.groupby(chaves, observed=True, dropna=False)["Quantidade"].sum().reset_index()
+
+
+class CuboQOE:
+    """
+    Agregados parciais por (SETOR, Mes, Cidade, Node), construídos uma vez
+    por versão dos dados.
+
+    Cada célula guarda somas, contagens e máximos de QOE, que podem ser
+    combinados para qualquer filtro de setor, mês e cidade sem voltar às
+    linhas de ações. Os motivos ficam em uma tabela à parte, por
+    (SETOR, Mes, Cidade, Motivo).
+    """
+
+    @instrumentar("cube.construir")
+    def __init__(self, df):
+        self.dimensoes = [col for col in DIMENSOES if col in df.columns]
+        self.celulas, self.motivos = agregar_celulas(df)
+
+    @classmethod
+    def de_agregados(cls, dimensoes, celulas, motivos):
+        """Cubo a partir de células e motivos já agregados (ver agregar_celulas)"""
+        cubo = object.__new__(cls)
+        cubo.dimensoes = dimensoes
+        cubo.celulas = celulas
+        cubo.motivos = motivos
+        return cubo
+
+    def combinar(self, outro):
+        """
+        Cubo com as ações dos dois cubos (ex.: versão anterior + linhas novas):
+        somas, contagens e ações somadas, máximos pelo maior.
+        """
+        return CuboQOE.de_agregados(
+            self.dimensoes,
+            somar_celulas([self.celulas, outro.celulas]),
+            somar_motivos([self.motivos, outro.motivos]),
+        )
+
+    def _selecionar(self, tabela, setor=None, meses=None, cidades=None):
+        mascara = pd.Series(True, index=tabela.index)
+        for col, valores in (("SETOR", setor), ("Mes", meses), ("Cidade", cidades)):
+            valores = normalizar_selecao(valores)
+            if valores is None:
+                continue
+            if col not in tabela.columns:
+                return tabela.iloc[0:0]
+            mascara &= tabela[col].isin(valores)
+        return tabela[mascara]
+
+    @instrumentar("cube.consolidar")
+    def consolidar(self, setor=None, meses=None, cidades=None, politica=POLITICA_PADRAO):
+        """Tabela de nodes e KPIs para o filtro, combinando as células do cubo"""
+        celulas = self._selecionar(self.celulas, setor, meses, cidades)
+
+        por_node = (
+            celulas.groupby("Node", observed=True)
+            .agg(
+                antes_soma=("antes_soma", "sum"),
+                antes_cont=("antes_cont", "sum"),
+                antes_max=("antes_max", "max"),
+                dep_soma=("dep_soma", "sum"),
+                dep_cont=("dep_cont", "sum"),
+                dep_max=("dep_max", "max"),
+            )
+        )
+
+        df_nodes = pd.DataFrame(index=por_node.index)
+        for col, prefixo in (("QOE ANTES", "antes"), ("QOE DEP", "dep")):
+            if POLITICAS[politica][col] == "max":
+                df_nodes[col] = por_node[f"{prefixo}_max"]
+            else:
+                df_nodes[col] = por_node[f"{prefixo}_soma"] / por_node[f"{prefixo}_cont"]
+        df_nodes = marcar_evolucao(df_nodes.reset_index())
+
+        return df_nodes, calcular_kpis(df_nodes, int(celulas["acoes"].sum()))
+
+    @instrumentar("cube.acoes_por_cidade")
+    def acoes_por_cidade(self, setor=None, meses=None, cidades=None):
+        """Número de ações por cidade (colunas Cidade, Ações)"""
+        if "Cidade" not in self.dimensoes:
+            return pd.DataFrame(columns=["Cidade", "Ações"])
+        celulas = self._selecionar(self.celulas, setor, meses, cidades)
+        df_agrupado = celulas.groupby("Cidade", observed=True)["acoes"].sum().reset_index(name="Ações")
+        df_agrupado["Cidade"] = df_agrupado["Cidade"].astype(str)
+        return df_agrupado
+
+    @instrumentar("cube.contar_motivos")
+    def contar_motivos(self, setor=None, meses=None, cidades=None):
+        """Número de ações por motivo (colunas Motivo, Quantidade)"""
+        if self.motivos is None:
+            return pd.DataFrame(columns=["Motivo", "Quantidade"])
+        linhas = self._selecionar(self.motivos, setor, meses, cidades)
+        df_agrupado = linhas.groupby("Motivo", observed=True)["Quantidade"].sum().reset_index()
+        df_agrupado["Motivo"] = df_agrupado["Motivo"].astype(str)
+        return df_agrupado
+
+
+@instrumentar("cube.atualizar")
+def atualizar_cubo(cubo, df_novas):
+    """Cubo anterior mais as linhas acrescentadas à planilha"""
+    return cubo.combinar(CuboQOE(df_novas))
+
+
+def obter_cubo(dados):
+    """
+    Cubo da versão carregada (construído na primeira chamada; se a versão
+    só acrescentou linhas, atualizado a partir do cubo da versão anterior)
+    """
+    return dados.derivado("cubo", CuboQOE, atualizar_cubo)
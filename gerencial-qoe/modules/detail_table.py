@@ -0,0 +1,126 @@
+import io
+import math
+
+import numpy as np
+import pandas as pd
+
+from modules.formatting import como_float, formatar_evolucao, formatar_inteiros, marcar_meta
+from modules.profiling import instrumentar
+
+# Colunas da tabela "Registros Detalhados", na ordem de exibição
+COLUNAS_DETALHE = ["Cidade", "Node", "Motivo", "QOE ANTES", "QOE DEP", "Responsável"]
+COLUNAS_BUSCA = ["Cidade", "Node", "Motivo", "Responsável"]
+ROTULOS = {"QOE ANTES": "QOE Antes", "QOE DEP": "QOE Depois", ">= 80": "≥ 80"}
+TAMANHOS_PAGINA = [25, 50, 100, 200]
+LINHAS_POR_BLOCO = 50_000
+
+
+def _contem(serie, termo):
+    """Máscara das linhas cujo texto contém o termo (sem diferenciar maiúsculas)"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Procura só nas categorias (poucas) e marca as linhas pelos códigos
+        categorias = serie.cat.categories.astype(str).str.contains(termo, case=False, regex=False)
+        return np.isin(serie.cat.codes.to_numpy(), np.flatnonzero(categorias))
+    return serie.astype("string").str.contains(termo, case=False, regex=False).fillna(False).to_numpy(bool)
+
+
+def _chave_ordem(df, coluna):
+    if coluna == "Evolução":
+        return df["QOE DEP"] - df["QOE ANTES"]
+    return df[coluna]
+
+
+@instrumentar("detail_table.selecionar_linhas")
+def selecionar_linhas(df, busca=None, ordem=None, crescente=True):
+    """
+    Posições das linhas de df que contêm `busca` em alguma coluna de texto,
+    ordenadas por `ordem` (valores vazios sempre no fim); sem ordem, na
+    ordem da planilha.
+    """
+    posicoes = np.arange(len(df))
+    termo = (busca or "").strip()
+    if termo:
+        mascara = np.zeros(len(df), dtype=bool)
+        for col in COLUNAS_BUSCA:
+            if col in df.columns:
+                mascara |= _contem(df[col], termo)
+        posicoes = posicoes[mascara]
+
+    if ordem:
+        chave = _chave_ordem(df, ordem).iloc[posicoes].reset_index(drop=True)
+        ordenadas = chave.sort_values(ascending=crescente, na_position="last", kind="stable").index
+        posicoes = posicoes[ordenadas.to_numpy()]
+    return posicoes
+
+
+def total_paginas(linhas, tamanho):
+    return max(1, math.ceil(linhas / tamanho))
+
+
+def pagina(df, posicoes, numero, tamanho):
+    """Linhas da página `numero` (a partir de 1) da seleção"""
+    inicio = (numero - 1) * tamanho
+    return df.iloc[posicoes[inicio:inicio + tamanho]]
+
+
+@instrumentar("detail_table.formatar_pagina")
+def formatar_pagina(df_pagina):
+    """Colunas formatadas para exibição, calculadas só para as linhas recebidas"""
+    antes = como_float(df_pagina["QOE ANTES"])
+    depois = como_float(df_pagina["QOE DEP"])
+
+    tabela = pd.DataFrame(index=df_pagina.index)
+    for col in COLUNAS_DETALHE:
+        if col in ("QOE ANTES", "QOE DEP"):
+            tabela[col] = formatar_inteiros(antes if col == "QOE ANTES" else depois)
+        elif col in df_pagina.columns:
+            tabela[col] = df_pagina[col]
+    tabela.insert(tabela.columns.get_loc("QOE DEP") + 1, "Evolução", formatar_evolucao(depois - antes))
+    tabela.insert(tabela.columns.get_loc("Evolução") + 1, ">= 80", marcar_meta(depois))
+    return tabela.rename(columns=ROTULOS)
+
+
+def _blocos(df, posicoes, tamanho_bloco):
+    colunas = [col for col in COLUNAS_DETALHE if col in df.columns]
+    for inicio in range(0, len(posicoes), tamanho_bloco):
+        yield df.iloc[posicoes[inicio:inicio + tamanho_bloco]][colunas]
+
+
+@instrumentar("detail_table.exportar_csv")
+def exportar_csv(df, posicoes, tamanho_bloco=LINHAS_POR_BLOCO):
+    """
+    CSV das linhas selecionadas (BytesIO, aceito pelo st.download_button).
+    O arquivo inteiro fica em memória; os blocos só evitam montar também
+    um texto único com todas as linhas antes de codificá-lo.
+    """
+    arquivo = io.BytesIO()
+    cabecalho = True
+    for bloco in _blocos(df, posicoes, tamanho_bloco):
+        arquivo.write(bloco.to_csv(index=False, header=cabecalho).encode("utf-8"))
+        cabecalho = False
+    if cabecalho:
+        arquivo.write((",".join(c for c in COLUNAS_DETALHE if c in df.columns) + "\n").encode("utf-8"))
+    arquivo.seek(0)
+    return arquivo
+
+
+@instrumentar("detail_table.exportar_parquet")
+def exportar_parquet(df, posicoes, tamanho_bloco=LINHAS_POR_BLOCO):
+    """Parquet das linhas selecionadas (BytesIO), um row group por bloco"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arquivo = io.BytesIO()
+    escritor = None
+    for bloco in _blocos(df, posicoes, tamanho_bloco):
+        tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+        if escritor is None:
+            escritor = pq.ParquetWriter(arquivo, tabela.schema)
+        escritor.write_table(tabela)
+    if escritor is None:
+        colunas = [col for col in COLUNAS_DETALHE if col in df.columns]
+        pq.write_table(pa.Table.from_pandas(df.iloc[0:0][colunas], preserve_index=False), arquivo)
+    else:
+        escritor.close()
+    arquivo.seek(0)
+    return arquivo
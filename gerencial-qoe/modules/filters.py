@@ -1,8 +1,96 @@
-def aplicar_filtros(df, setor=None, cidade=None, mes=None):
-    if setor:
-        df = df[df["SETOR"] == setor]
-    if cidade:
-        df = df[df["Cidade"] == cidade]
-    if mes:
-        df = df[df["Mes"] == mes]
+import numpy as np
+import pandas as pd
+
+from modules.profiling import instrumentar
+
+COLUNAS_INDEXADAS = ["SETOR", "Cidade", "Mes"]
+
+
+def normalizar_selecao(valor):
+    """None (sem filtro), valor único ou vários valores -> None ou lista sem repetições"""
+    if valor is None:
+        return None
+    if isinstance(valor, (list, tuple, set, np.ndarray, pd.Index)):
+        return list(dict.fromkeys(valor))
+    return [valor]
+
+
+class IndiceFiltros:
+    """
+    Índice invertido para os filtros: para cada valor de SETOR, Cidade e Mes,
+    as posições (ordenadas) das linhas que o contêm. Construído uma vez por
+    versão dos dados, a partir dos códigos das colunas category.
+    """
+
+    @instrumentar("filters.construir_indice")
+    def __init__(self, df):
+        self.total = len(df)
+        tipo = np.int32 if self.total < np.iinfo(np.int32).max else np.int64
+        self._vazio = np.empty(0, dtype=tipo)
+        self.posicoes = {}
+
+        for col in COLUNAS_INDEXADAS:
+            if col not in df.columns:
+                continue
+            serie = df[col]
+            if not isinstance(serie.dtype, pd.CategoricalDtype):
+                serie = serie.astype("category")
+
+            codigos = serie.cat.codes.to_numpy()
+            # Ordenação estável: dentro de cada valor as posições continuam crescentes
+            ordem = np.argsort(codigos, kind="stable").astype(tipo)
+            contagens = np.bincount(codigos[codigos >= 0], minlength=len(serie.cat.categories))
+            nulos = int((codigos < 0).sum())  # NaN tem código -1 e fica no início
+            blocos = np.split(ordem[nulos:], np.cumsum(contagens)[:-1])
+            self.posicoes[col] = dict(zip(serie.cat.categories, blocos))
+
+    def linhas(self, setor=None, cidade=None, mes=None):
+        """
+        Posições das linhas que atendem aos filtros, ou None se não houver filtro.
+        Cada filtro aceita um valor ou uma lista (união); filtros diferentes
+        são combinados por interseção.
+        """
+        resultado = None
+        for col, valores in (("SETOR", setor), ("Cidade", cidade), ("Mes", mes)):
+            valores = normalizar_selecao(valores)
+            if valores is None:
+                continue
+            if col not in self.posicoes:
+                return self._vazio
+
+            blocos = [self.posicoes[col].get(v, self._vazio) for v in valores]
+            if len(blocos) == 1:
+                selecao = blocos[0]
+            else:
+                selecao = np.sort(np.concatenate(blocos + [self._vazio]))
+
+            if resultado is None:
+                resultado = selecao
+            else:
+                resultado = np.intersect1d(resultado, selecao, assume_unique=True)
+            if len(resultado) == 0:
+                break
+        return resultado
+
+
+def obter_indice(dados):
+    """Índice de filtros da versão carregada (construído na primeira chamada)"""
+    return dados.derivado("indice_filtros", IndiceFiltros)
+
+
+@instrumentar("filters.aplicar_filtros")
+def aplicar_filtros(df, setor=None, cidade=None, mes=None, indice=None):
+    """
+    Filtra df por setor, cidade e mês (valor único ou lista).
+    Com um IndiceFiltros do mesmo df, as linhas são obtidas pelo índice, sem
+    varrer as colunas; sem filtros o próprio df é retornado, sem cópia.
+    """
+    if indice is not None:
+        posicoes = indice.linhas(setor=setor, cidade=cidade, mes=mes)
+        return df if posicoes is None else df.iloc[posicoes]
+
+    for col, valores in (("SETOR", setor), ("Cidade", cidade), ("Mes", mes)):
+        valores = normalizar_selecao(valores)
+        if valores is not None:
+            df = df[df[col].isin(valores)]
     return df
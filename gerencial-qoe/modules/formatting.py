@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from modules.config import LIMIAR_QOE_BOM, LIMIAR_QOE_CRITICO
+from modules.consolidation import LIMIAR_QOE
+
+FAIXAS = np.array(["🔴", "🟡", "🟢", "—"], dtype=object)  # a última é a de QOE vazio
+VAZIO = "-"
+
+_MAIOR_TABELADO = 1000
+_TEXTO_INTEIROS = np.array([str(i) for i in range(-_MAIOR_TABELADO, _MAIOR_TABELADO + 1)], dtype=object)
+
+
+def como_float(valores):
+    """Valores (Series, array, lista) como array float64, com NaN nos vazios"""
+    if isinstance(valores, (pd.Series, pd.Index)):
+        return valores.to_numpy(dtype="float64", na_value=np.nan)
+    return np.asarray(valores, dtype="float64")
+
+
+def classificar(valores, critico=LIMIAR_QOE_CRITICO, bom=LIMIAR_QOE_BOM):
+    """
+    Faixa de cada QOE: 🔴 abaixo de `critico`, 🟡 abaixo de `bom`, 🟢 a
+    partir de `bom` e "—" sem valor. Retorna um array de objetos.
+    """
+    v = como_float(valores)
+    faixa = np.searchsorted(np.array([critico, bom], dtype="float64"), v, side="right")
+    return FAIXAS[np.where(np.isnan(v), len(FAIXAS) - 1, faixa)]
+
+
+def formatar_inteiros(valores):
+    """'%.0f' de cada valor e '-' nos vazios"""
+    v = como_float(valores)
+    vazio = np.isnan(v)
+    # rint arredonda como o '%.0f' (metade para o par)
+    inteiros = np.rint(np.where(vazio, 0, v))
+    if len(v) and np.abs(inteiros).max() <= _MAIOR_TABELADO:
+        # Faixa usual de QOE e evolução: texto de uma tabela pronta, sem formatar valor a valor
+        texto = _TEXTO_INTEIROS[(inteiros + _MAIOR_TABELADO).astype(np.int64)]
+        texto[(inteiros == 0) & np.signbit(inteiros)] = "-0"  # '%.0f' % -0.4 == '-0'
+    else:
+        texto = np.char.mod("%.0f", inteiros).astype(object)
+    texto[vazio] = VAZIO
+    return texto
+
+
+def formatar_evolucao(valores):
+    """Como formatar_inteiros, com '+' nos valores positivos"""
+    v = como_float(valores)
+    texto = formatar_inteiros(v)
+    return np.where(v > 0, "+" + texto, texto)
+
+
+def marcar_meta(valores, limiar=LIMIAR_QOE):
+    """
+    '✅' onde o QOE atinge o limiar, '' nos demais e nos vazios. O padrão é
+    a meta fixa dos KPIs (LIMIAR_QOE), não a faixa 🟢 de classificar
+    """
+    return np.where(como_float(valores) >= limiar, "✅", "")
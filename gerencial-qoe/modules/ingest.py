@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+
+def impressoes_linhas(df_bruto):
+    """
+    Hash de cada linha da planilha como lida do Excel (antes do processamento).
+    Os valores são comparados como objetos, para que a impressão de uma linha
+    não dependa do tipo que o pandas inferiu para o bloco em que ela foi lida.
+    """
+    return pd.util.hash_pandas_object(df_bruto.astype(object), index=False).to_numpy()
+
+
+def bloco_repete_anterior(impressoes_anteriores, inicio, impressoes_bloco):
+    """
+    True se as linhas do bloco que começa na linha `inicio` e que já existiam
+    na versão anterior não mudaram (linhas além do fim da versão anterior
+    são novas e não entram na comparação).
+    """
+    n = max(0, min(len(impressoes_bloco), len(impressoes_anteriores) - inicio))
+    return np.array_equal(impressoes_bloco[:n], impressoes_anteriores[inicio:inicio + n])
+
+
+def e_anexo(impressoes_anteriores, colunas_anteriores, impressoes, colunas):
+    """True se a versão (impressões e colunas) só acrescentou linhas no final da anterior"""
+    if impressoes_anteriores is None or impressoes is None or colunas is None:
+        return False
+    if list(colunas) != list(colunas_anteriores or []):
+        return False
+    n = len(impressoes_anteriores)
+    return len(impressoes) >= n and np.array_equal(impressoes[:n], impressoes_anteriores)
+
+
+def alinhar_categorias(frames, colunas):
+    """Dá às colunas category dos frames as mesmas categorias (união), para concatenar sem perder o dtype"""
+    frames = list(frames)
+    for col in colunas:
+        series = [f[col] for f in frames if col in f.columns]
+        if not series or not all(isinstance(s.dtype, pd.CategoricalDtype) for s in series):
+            continue
+        categorias = series[0].cat.categories
+        for s in series[1:]:
+            categorias = categorias.union(s.cat.categories)
+        frames = [
+            f.assign(**{col: f[col].cat.set_categories(categorias)}) if col in f.columns else f
+            for f in frames
+        ]
+    return frames
+
+
+def concatenar(df_anterior, df_novas):
+    """DataFrame processado da versão anterior seguido das linhas novas já processadas"""
+    colunas_categoria = [
+        col for col in df_anterior.columns if isinstance(df_anterior[col].dtype, pd.CategoricalDtype)
+    ]
+    return pd.concat(alinhar_categorias([df_anterior, df_novas], colunas_categoria))
@@ -0,0 +1,173 @@
+import glob
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from modules import loader
+from modules.config import DIR_RELATORIOS, TRABALHOS_RELATORIO_SIMULTANEOS
+
+# Formato dos PDFs: incrementar quando mudam as regras dos KPIs ou o layout
+# dos relatórios, para os PDFs já gravados em disco não serem reaproveitados
+VERSAO_RELATORIO = "1"
+
+
+def _relatorio_completo(df, progresso):
+    # reportlab só é carregado quando um relatório é gerado
+    from modules.pdf_export import gerar_pdf_completo
+
+    return gerar_pdf_completo(df, progresso=progresso)
+
+
+# Tipos de relatório: tipo -> função que recebe (df, progresso) e retorna o buffer do PDF
+TIPOS_RELATORIO = {
+    "completo": _relatorio_completo,
+}
+
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+ERRO = "erro"
+
+
+class TrabalhoRelatorio:
+    """Geração de um relatório para uma versão dos dados"""
+
+    def __init__(self, tipo, versao, caminho, fonte=None):
+        self.id = uuid.uuid4().hex
+        self.tipo = tipo
+        self.versao = versao
+        self.caminho = caminho
+        self.fonte = fonte  # caminho dos dados de onde veio a versão
+        self.estado = PENDENTE
+        self.progresso = 0.0
+        self.etapa = "Na fila"
+        self.erro = None
+        self.criado_em = datetime.now()
+        self.concluido_em = None
+
+    @property
+    def ativo(self):
+        return self.estado in (PENDENTE, EXECUTANDO)
+
+
+class FilaRelatorios:
+    """
+    Fila local de relatórios executados em threads de segundo plano.
+
+    Os PDFs ficam em disco com o nome (tipo, versão dos dados): um pedido
+    para um relatório já gerado, ou em geração, reaproveita o mesmo
+    trabalho em vez de gerar o PDF de novo. Quando a planilha muda, a
+    versão muda e os arquivos das versões anteriores são removidos quando
+    o relatório da versão carregada fica pronto. O nome também leva
+    VERSAO_ESQUEMA e VERSAO_RELATORIO, para que os PDFs gravados antes de
+    uma atualização do código não sejam servidos de novo.
+    """
+
+    def __init__(self, diretorio=DIR_RELATORIOS, max_trabalhos=TRABALHOS_RELATORIO_SIMULTANEOS):
+        self.diretorio = diretorio
+        self._executor = ThreadPoolExecutor(max_workers=max_trabalhos, thread_name_prefix="relatorio")
+        self._trabalhos = {}  # id -> TrabalhoRelatorio
+        self._por_chave = {}  # (tipo, versao) -> id
+        self._lock = threading.Lock()
+
+    def _caminho(self, tipo, versao):
+        return os.path.join(self.diretorio, f"{tipo}_{versao}-{loader.VERSAO_ESQUEMA}-{VERSAO_RELATORIO}.pdf")
+
+    def submeter(self, dados, tipo="completo"):
+        """Pede o relatório para os dados carregados e retorna o id do trabalho"""
+        if tipo not in TIPOS_RELATORIO:
+            raise ValueError(f"Tipo de relatório desconhecido: {tipo}")
+
+        chave = (tipo, dados.versao)
+        with self._lock:
+            trabalho = self._trabalhos.get(self._por_chave.get(chave))
+            if trabalho is not None and (trabalho.ativo or (
+                    trabalho.estado == CONCLUIDO and os.path.exists(trabalho.caminho))):
+                return trabalho.id
+
+            trabalho = TrabalhoRelatorio(tipo, dados.versao, self._caminho(tipo, dados.versao), dados.caminho)
+            self._trabalhos[trabalho.id] = trabalho
+            self._por_chave[chave] = trabalho.id
+
+            if os.path.exists(trabalho.caminho):
+                # Gerado antes (inclusive por outro processo ou antes de reiniciar)
+                trabalho.estado = CONCLUIDO
+                trabalho.progresso = 1.0
+                trabalho.etapa = "Concluído"
+                trabalho.concluido_em = datetime.fromtimestamp(os.path.getmtime(trabalho.caminho))
+                return trabalho.id
+
+        self._executor.submit(self._executar, trabalho, dados.df)
+        return trabalho.id
+
+    def _executar(self, trabalho, df):
+        def progresso(fracao, etapa):
+            trabalho.progresso = fracao
+            trabalho.etapa = etapa
+
+        trabalho.estado = EXECUTANDO
+        temporario = f"{trabalho.caminho}.{trabalho.id}.tmp"
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            buffer = TIPOS_RELATORIO[trabalho.tipo](df, progresso)
+            with open(temporario, "wb") as f:
+                f.write(buffer.getvalue())
+            os.replace(temporario, trabalho.caminho)
+        except Exception as e:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            trabalho.erro = str(e)
+            trabalho.estado = ERRO
+            return
+
+        trabalho.concluido_em = datetime.now()
+        trabalho.estado = CONCLUIDO
+        self._remover_versoes_antigas(trabalho)
+
+    def _remover_versoes_antigas(self, trabalho):
+        # Só o relatório da versão carregada limpa os demais: um trabalho de uma
+        # versão anterior que termina depois apagaria o PDF da versão atual
+        atual = loader.versao_em_cache(trabalho.fonte) if trabalho.fonte else None
+        if atual is None or atual.versao != trabalho.versao:
+            return
+        # Remove também os PDFs de versões anteriores do esquema ou do formato
+        for caminho in glob.glob(os.path.join(self.diretorio, f"{trabalho.tipo}_*.pdf")):
+            if caminho != trabalho.caminho:
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    pass
+        with self._lock:
+            for chave, id_trabalho in list(self._por_chave.items()):
+                antigo = self._trabalhos[id_trabalho]
+                if chave[0] == trabalho.tipo and antigo.versao != trabalho.versao and not antigo.ativo:
+                    del self._por_chave[chave]
+                    del self._trabalhos[id_trabalho]
+
+    def status(self, id_trabalho):
+        """TrabalhoRelatorio do id, ou None se não existir"""
+        with self._lock:
+            return self._trabalhos.get(id_trabalho)
+
+    def resultado(self, id_trabalho):
+        """Bytes do PDF de um trabalho concluído, ou None"""
+        trabalho = self.status(id_trabalho)
+        if trabalho is None or trabalho.estado != CONCLUIDO or not os.path.exists(trabalho.caminho):
+            return None
+        with open(trabalho.caminho, "rb") as f:
+            return f.read()
+
+
+_fila = None
+_lock_fila = threading.Lock()
+
+
+def obter_fila():
+    """Fila de relatórios do processo, compartilhada entre sessões"""
+    global _fila
+    with _lock_fila:
+        if _fila is None:
+            _fila = FilaRelatorios()
+        return _fila
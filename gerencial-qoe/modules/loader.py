@@ -1,15 +1,674 @@
+import hashlib
+import json
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+
+import numpy as np
 import pandas as pd
 
-def carregar_planilha_local():
+from modules.config import (
+    DADOS_COMPARTILHADOS, FONTE_DADOS, INGESTAO_INCREMENTAL, LINHAS_BLOCO_EXCEL, PROCESSOS_ABAS, TODAS_ABAS
+)
+from modules.ingest import alinhar_categorias, bloco_repete_anterior, concatenar, e_anexo, impressoes_linhas
+from modules.profiling import instrumentar
+from modules.validation import (
+    juntar_quarentenas, montar_quarentena, normalizar_texto, quarentena_de_json, quarentena_para_json,
+    validar_datas, validar_qoe
+)
+
+
+def _pyarrow():
+    """(pyarrow, pyarrow.parquet), importados só quando o Parquet é usado; (None, None) sem pyarrow"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:  # sem pyarrow, a planilha é sempre lida do Excel
+        return None, None
+    return pa, pq
+
+
+# Dimensões de texto guardadas como category; nas chaves o valor é
+# normalizado em maiúsculas, nas descritivas apenas sem espaços nas pontas
+DIMENSOES_CHAVE = ["SETOR", "Cidade", "Node", "Mes"]
+DIMENSOES_TEXTO = ["Motivo", "Responsável"]
+COLUNAS_QOE = ["QOE ANTES", "QOE DEP"]
+# Únicas colunas da planilha lidas do Excel; as demais são ignoradas na leitura
+COLUNAS_PLANILHA = COLUNAS_QOE + ["SETOR", "Cidade", "Node", "Motivo", "Data Execução", "Responsável"]
+
+# Incrementar sempre que processar_dataframe mudar o formato de saída,
+# para que arquivos Parquet antigos sejam regerados
+VERSAO_ESQUEMA = "4"
+
+
+def caminho_planilha():
+    """Caminho absoluto da planilha ativa (data/Gerencial_QOE.xlsx)"""
     base_dir = os.path.dirname(os.path.abspath(__file__))
     excel_path = os.path.join(base_dir, "..", "data", "Gerencial_QOE.xlsx")
+    return os.path.normpath(excel_path)
 
-    excel_path = os.path.normpath(excel_path)
+
+def carregar_planilha_local(caminho=None):
+    excel_path = caminho or caminho_planilha()
 
     if os.path.exists(excel_path):
-        return pd.read_excel(excel_path)
+        return pd.concat(ler_blocos_excel(excel_path))
 
     return None
 
 
+def ler_blocos_excel(caminho, aba=None, tamanho_bloco=None, colunas=COLUNAS_PLANILHA):
+    """
+    Gera a planilha (primeira aba, ou `aba`) em DataFrames de até
+    `tamanho_bloco` linhas, só com as `colunas` presentes no cabeçalho e os
+    valores como estão nas células.
+
+    Usa o iterador somente-leitura do openpyxl: as linhas são lidas do
+    arquivo à medida que os blocos são consumidos, sem carregar a planilha
+    inteira. O índice de cada bloco continua o do anterior (posição da linha
+    na planilha, como no pd.read_excel). Sempre gera ao menos um bloco, vazio
+    se a planilha não tem linhas.
+    """
+    from openpyxl import load_workbook
+
+    tamanho_bloco = tamanho_bloco or LINHAS_BLOCO_EXCEL
+    livro = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        planilha = livro[aba] if aba is not None else livro.worksheets[0]
+        linhas = planilha.iter_rows(values_only=True)
+        cabecalho = [None if c is None else str(c) for c in next(linhas, ())]
+        posicoes = {}
+        for i, nome in enumerate(cabecalho):
+            if nome in colunas and nome not in posicoes:
+                posicoes[nome] = i
+        nomes, indices = list(posicoes), list(posicoes.values())
+
+        inicio, bloco, vazias = 0, [], 0
+        for linha in linhas:
+            valores = tuple(linha[i] if i < len(linha) else None for i in indices)
+            if all(v is None for v in linha):
+                # Linhas vazias só contam se houver dados depois delas
+                vazias += 1
+                continue
+            bloco.extend([(None,) * len(indices)] * vazias)
+            vazias = 0
+            bloco.append(valores)
+            if len(bloco) >= tamanho_bloco:
+                yield _bloco_bruto(bloco[:tamanho_bloco], nomes, inicio)
+                inicio += tamanho_bloco
+                bloco = bloco[tamanho_bloco:]
+        if bloco or inicio == 0:
+            yield _bloco_bruto(bloco, nomes, inicio)
+    finally:
+        livro.close()
+
+
+def _bloco_bruto(linhas, nomes, inicio):
+    return pd.DataFrame(linhas, columns=nomes, index=pd.RangeIndex(inicio, inicio + len(linhas)))
+
+
+def juntar_blocos(blocos):
+    """Blocos já processados em um único DataFrame, com as categorias unificadas"""
+    blocos = list(blocos)
+    if len(blocos) == 1:
+        return blocos[0]
+    colunas = [col for col in blocos[0].columns if isinstance(blocos[0][col].dtype, pd.CategoricalDtype)]
+    return pd.concat(alinhar_categorias(blocos, colunas))
+
+
+@instrumentar("loader.ler_excel_processado")
+def ler_excel_processado(caminho, aba=None, tamanho_bloco=None):
+    """
+    (DataFrame processado, quarentena) da planilha, lida e validada bloco a
+    bloco: cada bloco vira tipos compactos (float32, category) antes do
+    próximo ser lido, então o pico de memória acompanha o tamanho do bloco e
+    não a planilha.
+    """
+    return _juntar_validados([validar_dataframe(bloco) for bloco in ler_blocos_excel(caminho, aba, tamanho_bloco)])
+
+
+def _juntar_validados(validados):
+    df = juntar_blocos(df for df, _ in validados).reset_index(drop=True)
+    return df, juntar_quarentenas(quarentena for _, quarentena in validados)
+
+
+def _ler_aba(caminho, aba, tamanho_bloco):
+    """(df, quarentena) da aba, ou None se vazia; executada nos processos de ler_abas_processadas"""
+    validados = []
+    for bloco in ler_blocos_excel(caminho, aba, tamanho_bloco):
+        if bloco.empty:
+            continue
+        try:
+            validados.append(validar_dataframe(bloco))
+        except ValueError as e:
+            raise ValueError(f"{os.path.basename(caminho)}, aba '{aba}': {e}")
+    if not validados:
+        return None
+    df, quarentena = _juntar_validados(validados)
+    quarentena.insert(0, "Aba", aba)
+    return df, quarentena
+
+
+@instrumentar("loader.ler_abas_processadas")
+def ler_abas_processadas(caminho, processos=None, tamanho_bloco=None):
+    """
+    (df, quarentena) de cada aba com linhas, na ordem da planilha. Com
+    várias abas, cada uma é lida em um processo (até `processos`, padrão
+    PROCESSOS_ABAS).
+    """
+    from openpyxl import load_workbook
+
+    livro = load_workbook(caminho, read_only=True)
+    abas = livro.sheetnames
+    livro.close()
+
+    processos = min(processos or PROCESSOS_ABAS, len(abas))
+    if processos <= 1:
+        lidas = [_ler_aba(caminho, aba, tamanho_bloco) for aba in abas]
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            lidas = list(executor.map(_ler_aba, [caminho] * len(abas), abas, [tamanho_bloco] * len(abas)))
+    return [aba for aba in lidas if aba is not None]
+
+
+def _ler_excel_incremental(caminho, anterior):
+    """
+    (df, quarentena, impressões, colunas, linhas_base) da planilha lida em blocos.
+
+    Com `anterior`, os blocos cujas linhas repetem as da versão anterior não
+    são processados e linhas_base é o número de linhas aceitas dela; se
+    alguma linha anterior mudou (ou sumiu), a planilha é lida de novo e
+    processada inteira, com linhas_base None.
+    """
+    base = anterior.impressoes if anterior is not None else None
+    impressoes, validados, colunas, lidas = [], [], None, 0
+    for bloco in ler_blocos_excel(caminho):
+        colunas = list(bloco.columns)
+        impressoes_bloco = impressoes_linhas(bloco)
+        impressoes.append(impressoes_bloco)
+        if base is not None:
+            if colunas != list(anterior.colunas_brutas) or not bloco_repete_anterior(base, lidas, impressoes_bloco):
+                return _ler_excel_incremental(caminho, None)
+            bloco = bloco.iloc[max(0, len(base) - lidas):]
+        if len(bloco) or not validados:
+            validados.append(validar_dataframe(bloco))
+        lidas += len(impressoes_bloco)
+
+    impressoes = np.concatenate(impressoes)
+    if base is None:
+        df, quarentena = _juntar_validados(validados)
+        return df, quarentena, impressoes, colunas, None
+    if lidas < len(base):
+        return _ler_excel_incremental(caminho, None)
+    novos = [(df, quarentena) for df, quarentena in validados if len(df) or len(quarentena)]
+    if not novos:
+        return anterior.df, anterior.quarentena, impressoes, colunas, len(anterior.df)
+    df_novas, quarentena_novas = _juntar_validados(novos)
+    df = concatenar(anterior.df, df_novas).reset_index(drop=True)
+    quarentena = juntar_quarentenas([anterior.quarentena, quarentena_novas])
+    return df, quarentena, impressoes, colunas, len(anterior.df)
+
+
+@instrumentar("loader.validar_dataframe")
+def validar_dataframe(df):
+    """
+    Valida e converte o DataFrame lido em uma única passada vetorizada: QOE
+    numérico entre 0 e 100 (float32), Data Execução válida, dimensões de
+    texto normalizadas (category) e SETOR preenchido.
+
+    Retorna (df, quarentena): as linhas aceitas, já com os tipos finais, e
+    as rejeitadas como foram lidas, com a linha da planilha e os motivos
+    (ver modules.validation). Colunas obrigatórias ausentes invalidam a
+    planilha inteira (ValueError).
+    """
+    # Validação de colunas essenciais
+    colunas_obrigatorias = ["QOE ANTES", "QOE DEP", "SETOR"]
+    colunas_faltando = [col for col in colunas_obrigatorias if col not in df.columns]
+
+    if colunas_faltando:
+        raise ValueError(f"A planilha está faltando as seguintes colunas obrigatórias: {', '.join(colunas_faltando)}")
+
+    # Valores como lidos, para a quarentena (visão rasa: as colunas convertidas abaixo não a afetam)
+    bruto = df.copy(deep=False)
+
+    # Garante que Node existe, criando se necessário
+    if "Node" not in df.columns:
+        df["Node"] = df.index.astype(str)
+
+    rejeicoes = {}  # motivo -> máscara das linhas
+
+    # QOE numérico uma única vez (vazio e "ATUALIZANDO" viram NaN)
+    for col in COLUNAS_QOE:
+        df[col], motivos = validar_qoe(bruto[col])
+        rejeicoes.update((f"{col} {motivo}", mascara) for motivo, mascara in motivos.items())
+
+    # Converte Data Execução se existir
+    if "Data Execução" in df.columns:
+        df["Data Execução"], motivos = validar_datas(bruto["Data Execução"])
+        rejeicoes.update((f"Data Execução {motivo}", mascara) for motivo, mascara in motivos.items())
+        df["Mes"] = df["Data Execução"].dt.to_period("M").astype(str)
+
+    # Dimensões como category: filtros e groupbys trabalham sobre códigos inteiros
+    for col in DIMENSOES_CHAVE + DIMENSOES_TEXTO:
+        if col in df.columns:
+            df[col] = normalizar_texto(df[col], maiusculas=col in DIMENSOES_CHAVE)
+    rejeicoes["SETOR vazio"] = df["SETOR"].isna().to_numpy()
+
+    quarentena, rejeitadas = montar_quarentena(bruto, rejeicoes)
+    if rejeitadas.any():
+        df = df[~rejeitadas]
+        # Categorias só das linhas rejeitadas não aparecem nos filtros nem nos relatórios
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].cat.remove_unused_categories()
+    return df, quarentena
+
+
+def processar_dataframe(df):
+    """Processa o DataFrame após carregamento (linhas rejeitadas na validação são descartadas)"""
+    return validar_dataframe(df)[0]
+
+
+def caminho_sidecar(caminho):
+    """Arquivo Parquet gerado ao lado da planilha (ex.: data/Gerencial_QOE.parquet)"""
+    return os.path.splitext(caminho)[0] + ".parquet"
+
+
+def _metadados_sidecar(caminho, versao):
+    """Metadados do Parquet ao lado da planilha, se ele corresponder à versão dela (senão None)"""
+    sidecar = caminho_sidecar(caminho)
+    if not os.path.exists(sidecar):
+        return None
+    _, pq = _pyarrow()
+    if pq is None:
+        return None
+    try:
+        metadados = pq.read_schema(sidecar).metadata or {}
+    except Exception:
+        return None
+    if (metadados.get(b"qoe_versao") != versao.encode()
+            or metadados.get(b"qoe_esquema") != VERSAO_ESQUEMA.encode()):
+        return None
+    return metadados
+
+
+def sidecar_atual(caminho, versao=None):
+    """Caminho do Parquet ao lado da planilha se ele foi gerado da versão atual dela, senão None"""
+    versao = versao or _hash_arquivo(caminho)
+    return caminho_sidecar(caminho) if _metadados_sidecar(caminho, versao) else None
+
+
+def _ler_sidecar(caminho, versao):
+    """(df, quarentena) do Parquet já processado se ele corresponder à versão da planilha"""
+    metadados = _metadados_sidecar(caminho, versao)
+    if metadados is None:
+        return None
+    _, pq = _pyarrow()
+    sidecar = caminho_sidecar(caminho)
+    try:
+        quarentena = quarentena_de_json(json.loads(metadados[b"qoe_quarentena"]))
+        return pq.read_table(sidecar, memory_map=True).to_pandas(), quarentena
+    except Exception:
+        return None
+
+
+def _gravar_sidecar(caminho, df, quarentena, versao):
+    """
+    Grava o Parquet de forma atômica, com a quarentena nos metadados; falhas
+    (ex.: disco somente leitura) são ignoradas
+    """
+    pa, pq = _pyarrow()
+    if pa is None:
+        return
+    sidecar = caminho_sidecar(caminho)
+    temporario = f"{sidecar}.{os.getpid()}.tmp"
+    try:
+        tabela = pa.Table.from_pandas(df, preserve_index=False)
+        metadados = dict(tabela.schema.metadata or {})
+        metadados[b"qoe_versao"] = versao.encode()
+        metadados[b"qoe_esquema"] = VERSAO_ESQUEMA.encode()
+        metadados[b"qoe_quarentena"] = json.dumps(quarentena_para_json(quarentena)).encode()
+        pq.write_table(tabela.replace_schema_metadata(metadados), temporario)
+        os.replace(temporario, sidecar)
+    except Exception:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+@instrumentar("loader.ler_planilha_processada")
+def ler_planilha_processada(caminho, versao, assinatura=None, anterior=None):
+    """
+    Retorna o ConjuntoDados da versão da planilha.
+
+    Usa o Parquet ao lado do .xlsx quando ele foi gerado a partir da mesma
+    versão (hash) da planilha e do mesmo VERSAO_ESQUEMA; caso contrário lê o Excel, processa e
+    regrava o Parquet para as próximas cargas. O Excel é lido em blocos e só
+    com as colunas de COLUNAS_PLANILHA (ver ler_blocos_excel).
+
+    Ao ler o Excel guarda a impressão (hash) de cada linha. Se a versão
+    anterior (`anterior`) também tem impressões e a planilha nova apenas
+    acrescentou linhas no final, só as linhas novas são processadas e
+    juntadas ao DataFrame anterior, e as estruturas derivadas (cubo) são
+    atualizadas com esse delta. Qualquer outra mudança (linha editada,
+    removida ou reordenada, colunas diferentes) reprocessa a planilha inteira.
+    """
+    processado = _ler_sidecar(caminho, versao)
+    if processado is not None:
+        # Sem as impressões das linhas: a próxima mudança reprocessa tudo
+        return ConjuntoDados(*processado, versao, caminho, assinatura)
+
+    if not (INGESTAO_INCREMENTAL and anterior is not None and anterior.impressoes is not None):
+        anterior = None
+    df, quarentena, impressoes, colunas, linhas_base = _ler_excel_incremental(caminho, anterior)
+    _gravar_sidecar(caminho, df, quarentena, versao)
+
+    dados = ConjuntoDados(df, quarentena, versao, caminho, assinatura, impressoes, colunas)
+    if linhas_base is not None:
+        dados.basear_em(anterior, linhas_base)
+    return dados
+
+
+class ConjuntoDados:
+    """
+    Dados processados de uma versão da planilha, compartilhados entre sessões.
+    A versão é o hash do conteúdo do arquivo.
+
+    O DataFrame é único no processo e somente leitura: `df` entrega uma
+    visão rasa dele (Copy-on-Write, padrão a partir do pandas 3), de modo
+    que uma sessão que acrescente ou altere colunas copia só o que alterou,
+    sem afetar as demais.
+    """
+
+    def __init__(self, df, quarentena, versao, caminho, assinatura, impressoes=None, colunas_brutas=None):
+        self._df = df
+        # Linhas rejeitadas na validação (ver validar_dataframe)
+        self.quarentena = quarentena
+        self.versao = versao
+        self.caminho = caminho
+        self.assinatura = assinatura
+        self.impressoes = impressoes
+        self.colunas_brutas = colunas_brutas
+        self.carregado_em = datetime.now()
+        # FontePlanilhas quando os dados vêm de várias planilhas particionadas por Mes
+        self.fonte = None
+        self._derivados = {}
+        # Nomes dos derivados com atualização incremental (ver derivado)
+        self._incrementais = set()
+        self._lock_derivados = threading.Lock()
+        # Versão anterior da qual esta só acrescenta linhas (ingestão incremental)
+        self.linhas_base = None
+        # Derivados incrementais da versão anterior, até serem consumidos
+        self._derivados_base = None
+
+    @property
+    def df(self):
+        return self._df.copy(deep=False)
+
+    @property
+    def memoria(self):
+        """Bytes do DataFrame compartilhado (inclui o texto das categorias)"""
+        return int(self._df.memory_usage(deep=True).sum())
+
+    @property
+    def incremental(self):
+        return self.linhas_base is not None
+
+    def basear_em(self, anterior, linhas_base):
+        """Marca esta versão como a anterior mais linhas novas a partir de `linhas_base`"""
+        self.linhas_base = linhas_base
+        with anterior._lock_derivados:
+            # Só o que pode ser atualizado: o resto da versão anterior não fica preso a esta
+            self._derivados_base = {
+                nome: anterior._derivados[nome] for nome in anterior._incrementais if nome in anterior._derivados
+            }
+
+    def derivado(self, nome, construtor, atualizar=None):
+        """
+        Estrutura derivada dos dados (cubo, índices...), construída uma única
+        vez por versão e compartilhada entre sessões.
+
+        Com `atualizar(estrutura_anterior, df_novas)`, uma versão que só
+        acrescentou linhas parte da estrutura da versão anterior em vez de
+        reconstruí-la sobre o DataFrame inteiro.
+        """
+        with self._lock_derivados:
+            if atualizar is not None:
+                self._incrementais.add(nome)
+            if nome not in self._derivados:
+                base = self._derivados_base.pop(nome, None) if self._derivados_base else None
+                if not self._derivados_base:
+                    self._derivados_base = None
+                if atualizar is not None and base is not None:
+                    self._derivados[nome] = atualizar(base, self.df.iloc[self.linhas_base:])
+                else:
+                    self._derivados[nome] = construtor(self.df)
+            return self._derivados[nome]
+
+
+# Cache do processo: caminho -> ConjuntoDados
+_cache = {}
+_lock = threading.Lock()
+# Uma leitura de nova versão por vez; quem só consulta o cache não espera por ela
+_lock_carga = threading.Lock()
+_contadores = {"hits": 0, "misses": 0, "reloads": 0, "incrementais": 0}
+# Caminhos cujas versões novas são carregadas pelo observador (modules.watcher):
+# as requisições usam a versão publicada sem verificar o arquivo
+_observados = set()
+
+
+def _hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    h = hashlib.sha1()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _contar(chave):
+    with _lock:
+        _contadores[chave] += 1
+
+
+def resolver_fonte(caminho=None):
+    """Caminho normalizado da fonte dos dados (padrão: QOE_FONTE_DADOS ou data/Gerencial_QOE.xlsx)"""
+    return os.path.normpath(caminho or FONTE_DADOS or caminho_planilha())
+
+
+def fonte_particionada(caminho):
+    return os.path.isdir(caminho) or TODAS_ABAS
+
+
+@instrumentar("loader.carregar_dados")
+def carregar_dados(caminho=None):
+    """
+    Carrega e processa a planilha usando o cache do processo.
+
+    A chave é (caminho, tamanho, mtime, hash do conteúdo): enquanto tamanho e
+    mtime não mudam, o DataFrame em memória é reutilizado sem ler o arquivo.
+    Se mudarem mas o hash for o mesmo (ex.: arquivo copiado novamente), a
+    versão em memória também é mantida. Só há nova leitura quando o conteúdo
+    muda, preservando o comportamento de sempre usar a última planilha.
+
+    Com o observador ativo para o caminho (modules.watcher), a versão em
+    cache é devolvida sem verificar o arquivo: as versões novas são lidas
+    em segundo plano e publicadas por ele.
+
+    `caminho` (padrão: QOE_FONTE_DADOS ou data/Gerencial_QOE.xlsx) pode ser
+    também um diretório de planilhas; nesse caso, ou com QOE_TODAS_ABAS=1,
+    os dados vêm de uma FontePlanilhas particionada por Mes.
+
+    Retorna um ConjuntoDados ou None se o arquivo não existir.
+    """
+    caminho = resolver_fonte(caminho)
+    entrada = _cache.get(caminho)
+    if entrada is not None and caminho in _observados:
+        _contar("hits")
+        return entrada
+    if not os.path.exists(caminho):
+        return None
+    return atualizar_dados(caminho)
+
+
+def atualizar_dados(caminho, preparar=None):
+    """
+    Versão atual dos dados de `caminho`: a do cache se a fonte não mudou;
+    senão a nova versão é lida, processada e passada a `preparar` (que pode
+    construir as estruturas derivadas) e só então substitui a anterior no
+    cache, de uma vez. Retorna None se a fonte não tem planilhas.
+    """
+    with _lock_carga:
+        entrada = _cache.get(caminho)
+        if fonte_particionada(caminho):
+            nova = _ler_fonte_se_mudou(caminho, entrada)
+        else:
+            nova = _ler_planilha_se_mudou(caminho, entrada)
+        if nova is None or nova is entrada:
+            return nova
+
+        if preparar is not None:
+            preparar(nova)
+        with _lock:
+            _cache[caminho] = nova
+        return nova
+
+
+def _ler_planilha_se_mudou(caminho, entrada):
+    info = os.stat(caminho)
+    assinatura = (info.st_size, info.st_mtime_ns)
+    if entrada is not None and entrada.assinatura == assinatura:
+        _contar("hits")
+        return entrada
+
+    versao = _hash_arquivo(caminho)
+    if entrada is not None and entrada.versao == versao:
+        entrada.assinatura = assinatura
+        _contar("hits")
+        return entrada
+
+    _contar("misses" if entrada is None else "reloads")
+    with _trava_processos():
+        nova = _abrir_publicada(versao, caminho, assinatura, entrada)
+        if nova is None:
+            nova = ler_planilha_processada(caminho, versao, assinatura, anterior=entrada)
+            _publicar(nova)
+    if nova.incremental:
+        _contar("incrementais")
+    return nova
+
+
+def _ler_fonte_se_mudou(caminho, entrada):
+    """Como _ler_planilha_se_mudou, para várias planilhas: reprocessa só as alteradas"""
+    from modules.source import FontePlanilhas
+
+    fonte = entrada.fonte if entrada is not None else FontePlanilhas(caminho, todas_abas=TODAS_ABAS)
+    assinatura = fonte.assinatura()
+    if not assinatura:
+        return None
+    if entrada is not None and entrada.assinatura == assinatura:
+        _contar("hits")
+        return entrada
+
+    with _trava_processos():
+        versao = fonte.sincronizar()
+        if entrada is not None and entrada.versao == versao:
+            entrada.assinatura = assinatura
+            _contar("hits")
+            return entrada
+
+        _contar("misses" if entrada is None else "reloads")
+        nova = _abrir_publicada(versao, caminho, assinatura)
+        if nova is None:
+            nova = ConjuntoDados(fonte.ler(), fonte.quarentena(), versao, caminho, assinatura)
+            _publicar(nova)
+    nova.fonte = fonte
+    return nova
+
+
+def _trava_processos():
+    """Com QOE_DADOS_COMPARTILHADOS, trava entre os processos do servidor (ver modules.shared_store)"""
+    if not DADOS_COMPARTILHADOS:
+        return nullcontext()
+    from modules import shared_store
+
+    return shared_store.trava()
+
+
+def _chave_publicada(versao):
+    return f"{versao}-{VERSAO_ESQUEMA}"
+
+
+def _abrir_publicada(versao, caminho, assinatura, anterior=None):
+    """
+    ConjuntoDados mapeado do arquivo Arrow da versão, se algum processo já o
+    publicou (None sem QOE_DADOS_COMPARTILHADOS ou se ainda não publicado).
+    Se a versão só acrescentou linhas a `anterior`, as estruturas derivadas
+    são atualizadas com o delta, como na ingestão incremental.
+    """
+    if not DADOS_COMPARTILHADOS:
+        return None
+    from modules import shared_store
+
+    publicada = shared_store.abrir(_chave_publicada(versao))
+    if publicada is None:
+        return None
+    df, quarentena, impressoes, colunas = publicada
+    dados = ConjuntoDados(df, quarentena, versao, caminho, assinatura, impressoes, colunas)
+    if (INGESTAO_INCREMENTAL and anterior is not None
+            and e_anexo(anterior.impressoes, anterior.colunas_brutas, impressoes, colunas)):
+        dados.basear_em(anterior, len(anterior.df))
+    return dados
+
+
+def _publicar(dados):
+    """
+    Publica a versão para os outros processos e passa a usar o arquivo
+    mapeado também neste, liberando a cópia em memória
+    """
+    if not DADOS_COMPARTILHADOS:
+        return
+    from modules import shared_store
+
+    chave = _chave_publicada(dados.versao)
+    shared_store.publicar(chave, dados._df, dados.quarentena, dados.impressoes, dados.colunas_brutas)
+    dados._df = shared_store.abrir(chave)[0]
+
+
+def assinatura_fonte(caminho):
+    """(tamanho, mtime) da planilha, ou a assinatura de todas as planilhas do diretório"""
+    if fonte_particionada(caminho):
+        from modules.source import FontePlanilhas
+
+        entrada = _cache.get(caminho)
+        fonte = entrada.fonte if entrada is not None else FontePlanilhas(caminho, todas_abas=TODAS_ABAS)
+        return fonte.assinatura()
+    info = os.stat(caminho)
+    return (info.st_size, info.st_mtime_ns)
+
+
+def versao_em_cache(caminho):
+    """ConjuntoDados publicado para o caminho, sem verificar o arquivo (None se ainda não carregado)"""
+    return _cache.get(resolver_fonte(caminho))
+
+
+def observar(caminho, ativo=True):
+    """Marca o caminho como atualizado pelo observador (ver carregar_dados)"""
+    caminho = resolver_fonte(caminho)
+    with _lock:
+        if ativo:
+            _observados.add(caminho)
+        else:
+            _observados.discard(caminho)
+
+
+def estatisticas_cache():
+    """Contadores de hits, misses, recargas (e quantas foram incrementais) do cache de planilhas"""
+    with _lock:
+        return dict(_contadores, entradas=len(_cache))
+
+
+def limpar_cache():
+    """Descarta os dados em memória, forçando nova leitura na próxima chamada"""
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,202 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from modules.config import LINHAS_BLOCO_EXCEL, TODAS_ABAS
+from modules.consolidation import KPIS_VAZIOS, POLITICA_PADRAO
+from modules.cube import DIMENSOES, CuboQOE, agregar_celulas, somar_celulas, somar_motivos
+from modules.ingest import alinhar_categorias
+from modules.loader import _hash_arquivo, ler_blocos_excel, resolver_fonte, sidecar_atual, validar_dataframe
+from modules.profiling import instrumentar
+
+
+def _grupos(caminho, meses=None):
+    """
+    (versão dos dados, tarefas de leitura da fonte), as tarefas em grupos
+    sem células em comum: um grupo por mês das partições do diretório (um
+    mês nunca tem células de outro), ou um grupo só com os grupos de linhas
+    (row groups) do Parquet ao lado da planilha; sem Parquet atualizado, a
+    planilha. A versão é a mesma que carregar_dados atribui à fonte.
+    """
+    import pyarrow.parquet as pq
+
+    def tarefas(arquivos):
+        return [
+            ("parquet", arquivo, grupo)
+            for arquivo in arquivos
+            for grupo in range(pq.ParquetFile(arquivo).num_row_groups)
+        ]
+
+    if os.path.isdir(caminho) or TODAS_ABAS:
+        from modules.source import FontePlanilhas
+
+        fonte = FontePlanilhas(caminho, todas_abas=TODAS_ABAS)
+        versao = fonte.sincronizar()
+        grupos = [tarefas(fonte.arquivos([mes])) for mes in (fonte.meses() if meses is None else dict.fromkeys(meses))]
+        return versao, [grupo for grupo in grupos if grupo]
+
+    versao = _hash_arquivo(caminho)
+    sidecar = sidecar_atual(caminho, versao)
+    if sidecar is None:
+        return versao, [[("excel", caminho)]]
+    return versao, [tarefas([sidecar])]
+
+
+def _blocos(tarefa, tamanho_bloco):
+    """DataFrames processados da tarefa, de até tamanho_bloco linhas"""
+    if tarefa[0] == "excel":
+        for bloco in ler_blocos_excel(tarefa[1], tamanho_bloco=tamanho_bloco):
+            if len(bloco):
+                yield validar_dataframe(bloco)[0]
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    _, arquivo, grupo = tarefa
+    arquivo_parquet = pq.ParquetFile(arquivo, memory_map=True)
+    for lote in arquivo_parquet.iter_batches(batch_size=tamanho_bloco, row_groups=[grupo]):
+        df = pa.Table.from_batches([lote]).to_pandas()
+        for col in DIMENSOES:
+            # Dimensões como category em todos os blocos, para os cubos parciais se combinarem
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype("category")
+        yield df
+
+
+def _blocos_tarefas(tarefas, tamanho_bloco):
+    """
+    DataFrames processados das tarefas em sequência, reagrupados em blocos
+    de ao menos tamanho_bloco linhas (as partições de um mês costumam ser
+    bem menores que um bloco)
+    """
+    pendentes, linhas = [], 0
+    for tarefa in tarefas:
+        for df in _blocos(tarefa, tamanho_bloco):
+            if not len(df):
+                continue
+            pendentes.append(df)
+            linhas += len(df)
+            if linhas >= tamanho_bloco:
+                yield _juntar(pendentes)
+                pendentes, linhas = [], 0
+    if pendentes:
+        yield _juntar(pendentes)
+
+
+def _juntar(frames):
+    if len(frames) == 1:
+        return frames[0]
+    colunas = [col for col in frames[0].columns if isinstance(frames[0][col].dtype, pd.CategoricalDtype)]
+    return pd.concat(alinhar_categorias(frames, colunas), ignore_index=True)
+
+
+def _concatenar(agregados):
+    """Um agregado com as células de agregados sem células em comum, sem reagrupar"""
+    chaves = [col for col in DIMENSOES if col in agregados[0][1].columns]
+    celulas = pd.concat(alinhar_categorias([celulas for _, celulas, _ in agregados], chaves), ignore_index=True)
+    lista_motivos = [motivos for _, _, motivos in agregados]
+    if any(motivos is None for motivos in lista_motivos):
+        return agregados[0][0], celulas, None
+    chaves_motivo = [col for col in lista_motivos[0].columns if col != "Quantidade"]
+    return agregados[0][0], celulas, pd.concat(alinhar_categorias(lista_motivos, chaves_motivo), ignore_index=True)
+
+
+def _somar(parciais):
+    """Um agregado (dimensões, células, motivos) com a soma dos parciais"""
+    return (
+        parciais[0][0],
+        somar_celulas([celulas for _, celulas, _ in parciais]),
+        somar_motivos([motivos for _, _, motivos in parciais]),
+    )
+
+
+def _agregado_tarefas(tarefas, tamanho_bloco):
+    """
+    (dimensões, células, motivos) de uma sequência de tarefas, ou None se
+    não têm linhas. Cada bloco é agregado em um groupby. Os agregados dos
+    blocos são somados quando as células ainda não somadas passam de
+    algumas vezes o tamanho do bloco e do que já foi somado, e não a cada
+    bloco (com poucas células por node, a soma fica do tamanho do cubo)
+    """
+    parciais = []
+    somadas = pendentes = 0
+    for df in _blocos_tarefas(tarefas, tamanho_bloco):
+        celulas, motivos = agregar_celulas(df)
+        parciais.append(([col for col in DIMENSOES if col in df.columns], celulas, motivos))
+        pendentes += len(celulas)
+        if pendentes > max(4 * tamanho_bloco, somadas):
+            parciais = [_somar(parciais)]
+            somadas, pendentes = len(parciais[0][1]), 0
+    if not parciais:
+        return None
+    return _somar(parciais) if len(parciais) > 1 else parciais[0]
+
+
+@instrumentar("out_of_core.cubo_em_blocos")
+def cubo_em_blocos(caminho=None, meses=None, processos=1, tamanho_bloco=None):
+    """
+    CuboQOE da fonte construído sem carregar os dados inteiros: cada bloco
+    de linhas é agregado em somas, contagens e máximos de QOE por SETOR,
+    Mes, Cidade e Node, os agregados são somados e o cubo é montado uma vez
+    no fim. A memória acompanha o tamanho do bloco e o número de células do
+    cubo, não o de linhas.
+
+    Os meses das partições de um diretório são agregados separadamente e
+    só concatenados no fim, porque não têm células em comum. Com
+    `processos` > 1, os meses (ou os grupos de linhas do Parquet ao lado da
+    planilha) são divididos entre os processos. Com `meses`, só as
+    partições desses meses são lidas. Retorna None se não há linhas.
+    """
+    caminho = resolver_fonte(caminho)
+    if not os.path.exists(caminho):
+        raise FileNotFoundError(f"Planilha não encontrada: {caminho}")
+    tamanho_bloco = tamanho_bloco or LINHAS_BLOCO_EXCEL
+    _, grupos = _grupos(caminho, meses)
+
+    # Um grupo só (Parquet ao lado da planilha) é dividido entre os processos,
+    # e as partes, que podem ter células em comum, são somadas
+    somar = len(grupos) == 1 and processos > 1
+    if somar:
+        grupos = [grupos[0][i::processos] for i in range(min(processos, len(grupos[0])))]
+
+    if processos > 1 and len(grupos) > 1:
+        with ProcessPoolExecutor(max_workers=min(processos, len(grupos))) as executor:
+            agregados = list(executor.map(_agregado_tarefas, grupos, [tamanho_bloco] * len(grupos)))
+    else:
+        agregados = [_agregado_tarefas(grupo, tamanho_bloco) for grupo in grupos]
+
+    agregados = [agregado for agregado in agregados if agregado is not None]
+    if not agregados:
+        return None
+    if len(agregados) == 1:
+        return CuboQOE.de_agregados(*agregados[0])
+    return CuboQOE.de_agregados(*(_somar(agregados) if somar else _concatenar(agregados)))
+
+
+def blocos_fonte(caminho=None, tamanho_bloco=None):
+    """
+    (versão, blocos) da fonte sem carregá-la inteira: a versão dos dados
+    (a mesma de carregar_dados) e um gerador dos DataFrames processados,
+    em blocos de tamanho_bloco linhas, na ordem das linhas da carga inteira
+    """
+    caminho = resolver_fonte(caminho)
+    if not os.path.exists(caminho):
+        raise FileNotFoundError(f"Planilha não encontrada: {caminho}")
+    versao, grupos = _grupos(caminho)
+    tarefas = [tarefa for grupo in grupos for tarefa in grupo]
+    return versao, _blocos_tarefas(tarefas, tamanho_bloco or LINHAS_BLOCO_EXCEL)
+
+
+def consolidar_em_blocos(caminho=None, setor=None, meses=None, cidades=None,
+                         politica=POLITICA_PADRAO, processos=1, tamanho_bloco=None):
+    """
+    Tabela de nodes e KPIs do filtro pelo caminho fora da memória
+    (cubo_em_blocos); mesmos resultados de consolidar() sobre o DataFrame
+    inteiro filtrado
+    """
+    cubo = cubo_em_blocos(caminho, meses, processos, tamanho_bloco)
+    if cubo is None:
+        return pd.DataFrame(columns=["Node", "QOE ANTES", "QOE DEP"]), dict(KPIS_VAZIOS)
+    return cubo.consolidar(setor, meses, cidades, politica)
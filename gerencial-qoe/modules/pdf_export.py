@@ -7,9 +7,14 @@ from io import BytesIO
 from datetime import datetime
 import pandas as pd
 
+from modules.consolidation import calcular_kpis_por_grupo
+from modules.metrics import calcular_metricas
+from modules.profiling import instrumentar
+
 def formatar_metrica(nome, valor):
     """Formata nome de métrica para exibição"""
     nomes_formatados = {
+        "total_nodes": "Total de Nodes",
         "acoes": "Total de Ações",
         "qoe_antes": "QOE Médio Antes",
         "qoe_depois": "QOE Médio Depois",
@@ -51,8 +56,37 @@ def criar_tabela_metricas(resumo, styles):
     ]))
     return tabela
 
-def gerar_pdf_completo(df, calcular_metricas_func):
-    """Gera PDF completo com dados do dashboard geral, separados por mês e cidade"""
+def criar_secao_por_grupo(titulo, rotulo, resumos, titulo_secao, styles):
+    """Flowables de uma seção com uma tabela de métricas para cada grupo"""
+    flowables = [Paragraph(titulo, titulo_secao)]
+    for valor, resumo in resumos.items():
+        flowables.append(Paragraph(f"<b>{rotulo}: {valor}</b>", styles['Heading3']))
+        flowables.append(criar_tabela_metricas(resumo, styles))
+        flowables.append(Spacer(1, 0.2*inch))
+    return flowables
+
+def _resumos_por_grupo(df, coluna, calcular_metricas_func):
+    if calcular_metricas_func is None:
+        return calcular_kpis_por_grupo(df, coluna)
+    # Função de métricas informada pelo chamador: uma chamada por grupo
+    return {
+        valor: calcular_metricas_func(df[df[coluna] == valor])
+        for valor in sorted(df[coluna].dropna().unique().tolist())
+    }
+
+@instrumentar("pdf_export.gerar_pdf_completo")
+def gerar_pdf_completo(df, calcular_metricas_func=None, progresso=None):
+    """
+    Gera PDF completo com dados do dashboard geral, separados por mês e cidade.
+    As métricas de todos os meses e de todas as cidades são calculadas em uma
+    passada cada (modules.consolidation); calcular_metricas_func, se informada,
+    substitui esse cálculo e é chamada uma vez por grupo.
+    progresso, se informada, recebe (fração concluída, descrição da etapa).
+    """
+    def avisar(fracao, etapa):
+        if progresso is not None:
+            progresso(fracao, etapa)
+
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
     styles = getSampleStyleSheet()
@@ -75,43 +109,29 @@ def gerar_pdf_completo(df, calcular_metricas_func):
     story.append(Spacer(1, 0.3*inch))
     
     # Resumo Geral
+    avisar(0.1, "Resumo geral")
     story.append(Paragraph("Resumo Geral", titulo_secao))
-    resumo_geral = calcular_metricas_func(df)
+    resumo_geral = (calcular_metricas_func or calcular_metricas)(df)
     tabela_geral = criar_tabela_metricas(resumo_geral, styles)
     story.append(tabela_geral)
     story.append(Spacer(1, 0.3*inch))
     
     # Análise por Mês
-    if "Mes" in df.columns and len(df["Mes"].dropna().unique()) > 0:
-        story.append(Paragraph("Análise por Mês", titulo_secao))
-        meses = sorted(df["Mes"].dropna().unique().tolist())
-        
-        for mes in meses:
-            df_mes = df[df["Mes"] == mes].copy()
-            if len(df_mes) > 0:
-                story.append(Paragraph(f"<b>Mês: {mes}</b>", styles['Heading3']))
-                resumo_mes = calcular_metricas_func(df_mes)
-                tabela_mes = criar_tabela_metricas(resumo_mes, styles)
-                story.append(tabela_mes)
-                story.append(Spacer(1, 0.2*inch))
-        
+    avisar(0.2, "Análise por mês")
+    resumos_mes = _resumos_por_grupo(df, "Mes", calcular_metricas_func) if "Mes" in df.columns else {}
+    if resumos_mes:
+        story.extend(criar_secao_por_grupo("Análise por Mês", "Mês", resumos_mes, titulo_secao, styles))
         story.append(PageBreak())
     
     # Análise por Cidade
-    if "Cidade" in df.columns and len(df["Cidade"].dropna().unique()) > 0:
-        story.append(Paragraph("Análise por Cidade", titulo_secao))
-        cidades = sorted(df["Cidade"].dropna().unique().tolist())
-        
-        for cidade in cidades:
-            df_cidade = df[df["Cidade"] == cidade].copy()
-            if len(df_cidade) > 0:
-                story.append(Paragraph(f"<b>Cidade: {cidade}</b>", styles['Heading3']))
-                resumo_cidade = calcular_metricas_func(df_cidade)
-                tabela_cidade = criar_tabela_metricas(resumo_cidade, styles)
-                story.append(tabela_cidade)
-                story.append(Spacer(1, 0.2*inch))
+    avisar(0.35, "Análise por cidade")
+    resumos_cidade = _resumos_por_grupo(df, "Cidade", calcular_metricas_func) if "Cidade" in df.columns else {}
+    if resumos_cidade:
+        story.extend(criar_secao_por_grupo("Análise por Cidade", "Cidade", resumos_cidade, titulo_secao, styles))
     
+    avisar(0.5, "Montando o documento")
     doc.build(story)
+    avisar(1.0, "Concluído")
     buffer.seek(0)
     return buffer
 
@@ -0,0 +1,181 @@
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+from modules.config import PERFIL_JANELA, PERFIL_MEMORIA
+
+PERCENTIS = (0.5, 0.9, 0.99)
+
+if PERFIL_MEMORIA and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+class _Etapa:
+    def __init__(self):
+        self.contagem = 0
+        self.total = 0.0
+        self.tempos = deque(maxlen=PERFIL_JANELA)
+        self.bytes_resultado = deque(maxlen=PERFIL_JANELA)
+        self.pico_alocado = deque(maxlen=PERFIL_JANELA)
+
+
+_etapas = {}
+_lock = threading.Lock()
+# Etapas da execução atual do script, por thread (cada sessão roda em sua thread)
+_local = threading.local()
+# Etapas em andamento em todas as threads (com PERFIL_MEMORIA): id -> maior
+# pico visto desde o início da etapa
+_em_andamento = {}
+
+
+def _tamanho_resultado(resultado):
+    if isinstance(resultado, tuple):
+        return sum(_tamanho_resultado(r) for r in resultado)
+    if isinstance(resultado, pd.DataFrame):
+        return int(resultado.memory_usage(deep=False).sum())
+    return 0
+
+
+def registrar(etapa, segundos, bytes_resultado=0, pico_alocado=None):
+    with _lock:
+        dados = _etapas.setdefault(etapa, _Etapa())
+        dados.contagem += 1
+        dados.total += segundos
+        dados.tempos.append(segundos)
+        if bytes_resultado:
+            dados.bytes_resultado.append(bytes_resultado)
+        if pico_alocado is not None:
+            dados.pico_alocado.append(pico_alocado)
+
+    execucao = getattr(_local, "execucao", None)
+    if execucao is not None:
+        execucao.append((etapa, segundos))
+
+
+def _iniciar_memoria():
+    """
+    (id, memória alocada) no início da etapa. O pico do tracemalloc é
+    global: antes de zerá-lo, o pico atual é repassado às etapas em
+    andamento (aninhadas ou em outras threads), para que nenhuma perca o seu
+    """
+    with _lock:
+        pico = tracemalloc.get_traced_memory()[1]
+        for chave in _em_andamento:
+            _em_andamento[chave] = max(_em_andamento[chave], pico)
+        tracemalloc.reset_peak()
+        inicial = tracemalloc.get_traced_memory()[0]
+        chave = object()
+        _em_andamento[chave] = inicial
+    return chave, inicial
+
+
+def _pico_memoria(inicio):
+    """
+    Pico alocado acima do início da etapa. Inclui o que outras threads
+    alocaram ao mesmo tempo: o tracemalloc não separa por thread
+    """
+    chave, inicial = inicio
+    with _lock:
+        pico = max(_em_andamento.pop(chave), tracemalloc.get_traced_memory()[1])
+    return pico - inicial
+
+
+@contextmanager
+def medir(etapa):
+    """Mede o bloco e registra o tempo na etapa (também se o bloco falhar)"""
+    memoria = _iniciar_memoria() if PERFIL_MEMORIA else None
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        segundos = time.perf_counter() - inicio
+        pico = _pico_memoria(memoria) if PERFIL_MEMORIA else None
+        registrar(etapa, segundos, pico_alocado=pico)
+
+
+def instrumentar(etapa):
+    """
+    Decorador: mede cada chamada e o tamanho do DataFrame retornado (chamadas
+    que levantam exceção também são registradas, sem tamanho)
+    """
+    def decorador(func):
+        @functools.wraps(func)
+        def envoltorio(*args, **kwargs):
+            memoria = _iniciar_memoria() if PERFIL_MEMORIA else None
+            inicio = time.perf_counter()
+            resultado = None
+            try:
+                resultado = func(*args, **kwargs)
+                return resultado
+            finally:
+                segundos = time.perf_counter() - inicio
+                pico = _pico_memoria(memoria) if PERFIL_MEMORIA else None
+                registrar(etapa, segundos, _tamanho_resultado(resultado), pico)
+        return envoltorio
+    return decorador
+
+
+def iniciar_execucao():
+    """Começa a lista de etapas da execução atual (uma por rerun do Streamlit)"""
+    _local.execucao = []
+
+
+def etapas_execucao():
+    """[(etapa, segundos)] medidas desde iniciar_execucao, nesta thread"""
+    return list(getattr(_local, "execucao", None) or [])
+
+
+def _percentil(ordenados, p):
+    if not ordenados:
+        return None
+    return ordenados[min(len(ordenados) - 1, int(round(p * (len(ordenados) - 1))))]
+
+
+def resumo():
+    """Estatísticas por etapa (percentis sobre a janela mais recente)"""
+    with _lock:
+        copia = {
+            nome: (e.contagem, e.total, sorted(e.tempos), list(e.bytes_resultado), list(e.pico_alocado))
+            for nome, e in _etapas.items()
+        }
+
+    linhas = []
+    for nome, (contagem, total, tempos, bytes_resultado, picos) in sorted(copia.items()):
+        linha = {"etapa": nome, "chamadas": contagem, "total_s": round(total, 6)}
+        for p in PERCENTIS:
+            linha[f"p{int(p * 100)}_ms"] = round(_percentil(tempos, p) * 1000, 3)
+        linha["bytes_resultado_medio"] = int(sum(bytes_resultado) / len(bytes_resultado)) if bytes_resultado else None
+        linha["pico_alocado_max"] = max(picos) if picos else None
+        linhas.append(linha)
+    return linhas
+
+
+def exportar_json():
+    return json.dumps(resumo(), ensure_ascii=False, indent=2)
+
+
+def exportar_prometheus():
+    """Resumo no formato texto do Prometheus (summary por etapa)"""
+    saida = [
+        "# HELP qoe_etapa_segundos Duração das etapas do Gerencial QOE",
+        "# TYPE qoe_etapa_segundos summary",
+    ]
+    for linha in resumo():
+        rotulo = linha["etapa"].replace("\\", "\\\\").replace('"', '\\"')
+        for p in PERCENTIS:
+            valor = linha[f"p{int(p * 100)}_ms"] / 1000
+            saida.append(f'qoe_etapa_segundos{{etapa="{rotulo}",quantile="{p}"}} {valor:.6f}')
+        saida.append(f'qoe_etapa_segundos_sum{{etapa="{rotulo}"}} {linha["total_s"]:.6f}')
+        saida.append(f'qoe_etapa_segundos_count{{etapa="{rotulo}"}} {linha["chamadas"]}')
+    return "\n".join(saida) + "\n"
+
+
+def limpar():
+    with _lock:
+        _etapas.clear()
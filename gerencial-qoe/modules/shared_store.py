@@ -0,0 +1,131 @@
+import glob
+import json
+import os
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from modules.config import DIR_DADOS_COMPARTILHADOS
+from modules.profiling import instrumentar
+from modules.validation import quarentena_de_json, quarentena_para_json
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+EXTENSAO = ".arrow"
+EXTENSAO_IMPRESSOES = ".impressoes.npy"
+# Versões mantidas no diretório: a atual e a anterior, que processos que
+# ainda não trocaram de versão podem estar usando
+VERSOES_MANTIDAS = 2
+
+
+def _arquivo(chave, diretorio):
+    return os.path.join(diretorio, f"{chave}{EXTENSAO}")
+
+
+@contextmanager
+def trava(diretorio=DIR_DADOS_COMPARTILHADOS):
+    """
+    Trava entre processos (arquivo .trava no diretório): só um processo lê
+    e publica uma versão nova; os demais esperam e usam a publicada.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    with open(os.path.join(diretorio, ".trava"), "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK desiste depois de ~10 s; continua esperando
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _coluna_arrow(serie):
+    """
+    Coluna sem conversões de valores: NaN e os códigos das categorias são
+    gravados como estão, para que a leitura mapeada os use sem copiar
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy()
+        categorias = pa.array(serie.cat.categories.to_numpy(dtype=object), type=pa.string())
+        return pa.DictionaryArray.from_arrays(pa.array(codigos, mask=codigos < 0), categorias)
+    return pa.array(serie.to_numpy(), from_pandas=False)
+
+
+@instrumentar("shared_store.publicar")
+def publicar(chave, df, quarentena, impressoes=None, colunas_brutas=None, diretorio=DIR_DADOS_COMPARTILHADOS):
+    """
+    Grava a versão como arquivo Arrow IPC (sem compressão, para ser mapeado
+    em memória) e remove as versões antigas. O arquivo .arrow só aparece
+    completo (gravação atômica), e é ele que marca a versão como publicada.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    tabela = pa.table([_coluna_arrow(df[col]) for col in df.columns], names=list(df.columns))
+    metadados = {
+        b"qoe_quarentena": json.dumps(quarentena_para_json(quarentena)).encode(),
+        b"qoe_colunas_brutas": json.dumps(colunas_brutas).encode(),
+    }
+    tabela = tabela.replace_schema_metadata(metadados)
+
+    if impressoes is not None:
+        np.save(os.path.join(diretorio, f"{chave}{EXTENSAO_IMPRESSOES}"), impressoes)
+    arquivo = _arquivo(chave, diretorio)
+    temporario = f"{arquivo}.{os.getpid()}.tmp"
+    try:
+        with pa.OSFile(temporario, "wb") as f:
+            with pa.ipc.new_file(f, tabela.schema) as escritor:
+                escritor.write_table(tabela)
+        os.replace(temporario, arquivo)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+    _remover_antigas(diretorio)
+
+
+@instrumentar("shared_store.abrir")
+def abrir(chave, diretorio=DIR_DADOS_COMPARTILHADOS):
+    """
+    (df, quarentena, impressões, colunas_brutas) da versão publicada, ou
+    None. O arquivo é mapeado em memória: as colunas numéricas, de data e
+    os códigos das categorias do DataFrame apontam para as páginas do
+    arquivo (somente leitura), compartilhadas por todos os processos que o
+    abrem, em vez de uma cópia por processo.
+    """
+    arquivo = _arquivo(chave, diretorio)
+    if not os.path.exists(arquivo):
+        return None
+    tabela = pa.ipc.open_file(pa.memory_map(arquivo, "r")).read_all()
+    metadados = tabela.schema.metadata or {}
+    df = tabela.replace_schema_metadata(None).to_pandas(split_blocks=True)
+
+    arquivo_impressoes = os.path.join(diretorio, f"{chave}{EXTENSAO_IMPRESSOES}")
+    impressoes = np.load(arquivo_impressoes, mmap_mode="r") if os.path.exists(arquivo_impressoes) else None
+    quarentena = quarentena_de_json(json.loads(metadados[b"qoe_quarentena"]))
+    return df, quarentena, impressoes, json.loads(metadados[b"qoe_colunas_brutas"])
+
+
+def _remover_antigas(diretorio):
+    publicadas = sorted(glob.glob(os.path.join(diretorio, f"*{EXTENSAO}")), key=os.path.getmtime, reverse=True)
+    for arquivo in publicadas[VERSOES_MANTIDAS:]:
+        chave = os.path.basename(arquivo)[:-len(EXTENSAO)]
+        for antigo in (arquivo, os.path.join(diretorio, f"{chave}{EXTENSAO_IMPRESSOES}")):
+            try:
+                os.remove(antigo)
+            except OSError:
+                pass  # ainda mapeado por outro processo (Windows); fica para a próxima
@@ -0,0 +1,233 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from modules.ingest import alinhar_categorias
+from modules.loader import VERSAO_ESQUEMA, _hash_arquivo, ler_abas_processadas, ler_excel_processado
+from modules.profiling import instrumentar
+from modules.validation import juntar_quarentenas, quarentena_de_json, quarentena_para_json
+
+MANIFESTO = "manifesto.json"
+PARTICAO_NULA = "__nulo__"
+
+
+def _gravar_atomico(caminho, gravar):
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        gravar(temporario)
+        os.replace(temporario, caminho)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+class FontePlanilhas:
+    """
+    Várias planilhas (todas as .xlsx de um diretório, ou uma planilha com
+    várias abas) guardadas já processadas em Parquet particionado por Mes:
+
+        <particoes>/Mes=2025-11/<planilha>.parquet
+        <particoes>/Mes=2025-12/<planilha>.parquet
+        <particoes>/manifesto.json
+
+    sincronizar() reprocessa apenas as planilhas novas ou alteradas (hash do
+    conteúdo) e remove as partições das que saíram do diretório. ler() com
+    uma lista de meses lê só as partições desses meses.
+    """
+
+    def __init__(self, caminho, todas_abas=False, diretorio_particoes=None):
+        self.caminho = os.path.normpath(caminho)
+        self.todas_abas = todas_abas
+        if diretorio_particoes is None:
+            if os.path.isdir(self.caminho):
+                diretorio_particoes = os.path.join(self.caminho, "_particoes")
+            else:
+                diretorio_particoes = os.path.splitext(self.caminho)[0] + "_particoes"
+        self.diretorio = diretorio_particoes
+        self._manifesto = None
+
+    def planilhas(self):
+        """Planilhas da fonte, em ordem de nome (ignora arquivos temporários do Excel)"""
+        if not os.path.isdir(self.caminho):
+            return [self.caminho] if os.path.exists(self.caminho) else []
+        return sorted(
+            p for p in glob.glob(os.path.join(self.caminho, "*.xlsx"))
+            if not os.path.basename(p).startswith("~$")
+        )
+
+    def assinatura(self):
+        """(nome, tamanho, mtime) de cada planilha: muda quando algum arquivo muda"""
+        assinatura = []
+        for p in self.planilhas():
+            info = os.stat(p)
+            assinatura.append((os.path.basename(p), info.st_size, info.st_mtime_ns))
+        return tuple(assinatura)
+
+    @property
+    def manifesto(self):
+        if self._manifesto is None:
+            self._manifesto = self._ler_manifesto()
+        return self._manifesto
+
+    def _ler_manifesto(self):
+        vazio = {"esquema": VERSAO_ESQUEMA, "todas_abas": self.todas_abas, "planilhas": {}}
+        try:
+            with open(os.path.join(self.diretorio, MANIFESTO), encoding="utf-8") as f:
+                manifesto = json.load(f)
+        except (OSError, ValueError):
+            return vazio
+        if manifesto.get("esquema") != VERSAO_ESQUEMA or manifesto.get("todas_abas") != self.todas_abas:
+            # Partições de outro esquema ou modo de leitura: refaz tudo
+            shutil.rmtree(self.diretorio, ignore_errors=True)
+            return vazio
+        return manifesto
+
+    def _gravar_manifesto(self):
+        def gravar(temporario):
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(self.manifesto, f, ensure_ascii=False, indent=2)
+
+        _gravar_atomico(os.path.join(self.diretorio, MANIFESTO), gravar)
+
+    def _dir_mes(self, mes):
+        return os.path.join(self.diretorio, f"Mes={PARTICAO_NULA if mes is None else mes}")
+
+    def _ler_abas(self, caminho):
+        if not self.todas_abas:
+            return [ler_excel_processado(caminho)]
+        return ler_abas_processadas(caminho)
+
+    def _remover_particoes(self, nome, entrada):
+        for mes in entrada["meses"]:
+            arquivo = os.path.join(self._dir_mes(mes), f"{entrada['chave']}.parquet")
+            if os.path.exists(arquivo):
+                os.remove(arquivo)
+            try:
+                os.rmdir(self._dir_mes(mes))
+            except OSError:
+                pass  # outras planilhas ainda têm dados neste mês
+        del self.manifesto["planilhas"][nome]
+
+    @instrumentar("source.ingerir_planilha")
+    def _ingerir(self, caminho, hash_planilha):
+        """Processa uma planilha e grava uma partição por mês"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        nome = os.path.basename(caminho)
+        chave = hashlib.sha1(nome.encode()).hexdigest()[:16]
+        lidas = self._ler_abas(caminho)
+        frames = [df for df, _ in lidas if len(df)]
+        quarentena = juntar_quarentenas(quarentena for _, quarentena in lidas)
+        meses = []
+        if frames:
+            df = pd.concat(alinhar_categorias(frames, _colunas_categoria(frames[0])), ignore_index=True)
+            if "Mes" not in df.columns:
+                df["Mes"] = pd.Series(pd.NA, index=df.index, dtype="category")
+            for mes, parte in df.groupby("Mes", observed=True, dropna=False):
+                mes = None if pd.isna(mes) else str(mes)
+                parte = parte.reset_index(drop=True)
+                for col in _colunas_categoria(parte):
+                    parte[col] = parte[col].cat.remove_unused_categories()
+                tabela = pa.Table.from_pandas(parte, preserve_index=False)
+                os.makedirs(self._dir_mes(mes), exist_ok=True)
+                _gravar_atomico(
+                    os.path.join(self._dir_mes(mes), f"{chave}.parquet"),
+                    lambda temporario: pq.write_table(tabela, temporario),
+                )
+                meses.append(mes)
+        self.manifesto["planilhas"][nome] = {
+            "hash": hash_planilha, "chave": chave, "meses": meses,
+            "quarentena": quarentena_para_json(quarentena),
+        }
+
+    @instrumentar("source.sincronizar")
+    def sincronizar(self):
+        """
+        Atualiza as partições com as planilhas atuais e retorna a versão da
+        fonte (hash das versões de todas as planilhas).
+        """
+        planilhas = {os.path.basename(p): p for p in self.planilhas()}
+        registradas = self.manifesto["planilhas"]
+        os.makedirs(self.diretorio, exist_ok=True)
+
+        alterou = False
+        for nome in list(registradas):
+            if nome not in planilhas:
+                self._remover_particoes(nome, registradas[nome])
+                alterou = True
+
+        for nome, caminho in planilhas.items():
+            hash_planilha = _hash_arquivo(caminho)
+            entrada = registradas.get(nome)
+            if entrada is not None and entrada["hash"] == hash_planilha:
+                continue
+            if entrada is not None:
+                self._remover_particoes(nome, entrada)
+            self._ingerir(caminho, hash_planilha)
+            alterou = True
+
+        if alterou or not os.path.exists(os.path.join(self.diretorio, MANIFESTO)):
+            self._gravar_manifesto()
+        return self.versao()
+
+    def versao(self):
+        h = hashlib.sha1(self.manifesto["esquema"].encode())
+        for nome, entrada in sorted(self.manifesto["planilhas"].items()):
+            h.update(f"{nome}:{entrada['hash']}".encode())
+        return h.hexdigest()
+
+    def meses(self):
+        """Meses com dados em alguma planilha (None = ações sem data)"""
+        meses = {mes for e in self.manifesto["planilhas"].values() for mes in e["meses"]}
+        return sorted(meses, key=lambda m: (m is None, m or ""))
+
+    def _vazio(self):
+        """DataFrame sem linhas, com as colunas de uma partição qualquer"""
+        import pyarrow.parquet as pq
+
+        for arquivo in glob.glob(os.path.join(self.diretorio, "Mes=*", "*.parquet")):
+            return pq.read_schema(arquivo).empty_table().to_pandas()
+        return pd.DataFrame()
+
+    def arquivos(self, meses=None):
+        """Arquivos Parquet das partições (só as dos `meses`, se informados), na ordem dos meses"""
+        selecionados = self.meses() if meses is None else [m for m in dict.fromkeys(meses) if m in self.meses()]
+        arquivos = []
+        for mes in selecionados:
+            for entrada in self.manifesto["planilhas"].values():
+                if mes in entrada["meses"]:
+                    arquivos.append(os.path.join(self._dir_mes(mes), f"{entrada['chave']}.parquet"))
+        return arquivos
+
+    @instrumentar("source.ler")
+    def ler(self, meses=None):
+        """
+        DataFrame processado das partições; com `meses`, lê apenas as
+        partições desses meses. As colunas category ficam com as categorias
+        unidas e ordenadas, como na leitura de uma planilha única.
+        """
+        import pyarrow.parquet as pq
+
+        frames = [pq.read_table(arquivo, memory_map=True).to_pandas() for arquivo in self.arquivos(meses)]
+        if not frames:
+            return self._vazio()
+        colunas = {col for f in frames for col in _colunas_categoria(f)}
+        return pd.concat(alinhar_categorias(frames, colunas), ignore_index=True)
+
+    def quarentena(self):
+        """Linhas rejeitadas na validação de todas as planilhas, com o nome da planilha"""
+        quarentenas = []
+        for nome, entrada in sorted(self.manifesto["planilhas"].items()):
+            quarentena = quarentena_de_json(entrada["quarentena"])
+            quarentena.insert(0, "Planilha", nome)
+            quarentenas.append(quarentena)
+        return juntar_quarentenas(quarentenas)
+
+
+def _colunas_categoria(df):
+    return [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)]
@@ -0,0 +1,206 @@
+import os
+import sqlite3
+import threading
+from contextlib import closing
+
+import pandas as pd
+
+from modules.consolidation import POLITICA_PADRAO, POLITICAS, calcular_kpis, marcar_evolucao
+from modules.filters import normalizar_selecao
+from modules.loader import VERSAO_ESQUEMA, resolver_fonte
+from modules.out_of_core import blocos_fonte
+from modules.profiling import instrumentar
+
+TABELA = "acoes"
+COLUNAS_INDICE = ["SETOR", "Cidade", "Mes", "Node"]
+TAMANHO_LOTE = 50_000
+
+
+def _q(coluna):
+    """Nome de coluna entre aspas (as colunas da planilha têm espaços e acentos)"""
+    return '"' + coluna.replace('"', '""') + '"'
+
+
+def caminho_base(dados):
+    """Arquivo SQLite ao lado da planilha (ou dentro do diretório de planilhas)"""
+    return _caminho_base_fonte(dados.caminho)
+
+
+def _caminho_base_fonte(caminho):
+    if os.path.isdir(caminho):
+        return os.path.join(caminho, "_qoe.sqlite")
+    return os.path.splitext(caminho)[0] + ".sqlite"
+
+
+class BaseSQL:
+    """
+    Ações de uma versão dos dados em um arquivo SQLite, com índices em
+    SETOR, Cidade, Mes e Node.
+
+    Mesma interface de consulta do CuboQOE (consolidar, acoes_por_cidade,
+    contar_motivos), mais linhas() para a tabela de registros detalhados;
+    filtros e agregações são executados pelo SQLite. O arquivo é gravado
+    uma vez por versão e reaproveitado por outros processos (cada worker
+    abre apenas conexões de leitura).
+
+    O arquivo é gravado a partir de `df` ou de `blocos`, um iterável de
+    DataFrames com as linhas em sequência (ver construir_base_em_blocos).
+    """
+
+    def __init__(self, caminho, df=None, versao=None, blocos=None):
+        self.caminho = caminho
+        self.versao = versao
+        if df is not None:
+            blocos = [df]
+        if blocos is not None and self._versao_gravada() != versao:
+            self._construir(blocos)
+        with closing(self._conectar()) as con:
+            self.colunas = [linha[1] for linha in con.execute(f"PRAGMA table_info({TABELA})")]
+
+    def _conectar(self):
+        return sqlite3.connect(f"file:{self.caminho}?mode=ro", uri=True, check_same_thread=False)
+
+    def _versao_gravada(self):
+        if not os.path.exists(self.caminho):
+            return None
+        try:
+            with closing(self._conectar()) as con:
+                meta = dict(con.execute("SELECT chave, valor FROM meta"))
+        except sqlite3.Error:
+            return None
+        if meta.get("esquema") != VERSAO_ESQUEMA:
+            return None
+        return meta.get("versao")
+
+    @instrumentar("sql.construir")
+    def _construir(self, blocos):
+        """Grava as ações em um arquivo temporário e o troca pelo definitivo de forma atômica"""
+        temporario = f"{self.caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with closing(sqlite3.connect(temporario)) as con:
+                colunas, linhas = None, 0
+                for df in blocos:
+                    # _linha segue de um bloco para o outro: a ordem das linhas da carga inteira
+                    tabela = df.copy(deep=False)
+                    tabela.insert(0, "_linha", range(linhas, linhas + len(tabela)))
+                    tabela.to_sql(TABELA, con, index=False, chunksize=TAMANHO_LOTE, if_exists="append")
+                    colunas = list(tabela.columns)
+                    linhas += len(tabela)
+                if colunas is None:
+                    raise ValueError(f"Nenhuma ação para gravar em {self.caminho}")
+                for col in COLUNAS_INDICE:
+                    if col in colunas:
+                        con.execute(f"CREATE INDEX {_q('idx_' + col)} ON {TABELA} ({_q(col)})")
+                chaves = [col for col in ["SETOR", "Mes", "Cidade", "Node"] if col in colunas]
+                con.execute(f"CREATE INDEX idx_filtros ON {TABELA} ({', '.join(_q(c) for c in chaves)})")
+                con.execute("CREATE TABLE meta (chave TEXT PRIMARY KEY, valor TEXT)")
+                con.executemany(
+                    "INSERT INTO meta VALUES (?, ?)",
+                    [("versao", self.versao), ("esquema", VERSAO_ESQUEMA)],
+                )
+                con.execute("ANALYZE")
+                con.commit()
+            os.replace(temporario, self.caminho)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+    def _filtro(self, setor=None, meses=None, cidades=None):
+        """Cláusula WHERE e parâmetros; None se o filtro usa coluna que não existe"""
+        condicoes = []
+        parametros = []
+        for col, valores in (("SETOR", setor), ("Mes", meses), ("Cidade", cidades)):
+            valores = normalizar_selecao(valores)
+            if valores is None:
+                continue
+            if col not in self.colunas:
+                return None
+            condicoes.append(f"{_q(col)} IN ({', '.join('?' * len(valores))})")
+            parametros.extend(str(v) for v in valores)
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        return where, parametros
+
+    def _consultar(self, sql, parametros=()):
+        with closing(self._conectar()) as con:
+            return pd.read_sql_query(sql, con, params=parametros)
+
+    def _e(self, where, condicao):
+        return f"{where} AND {condicao}" if where else f"WHERE {condicao}"
+
+    @instrumentar("sql.consolidar")
+    def consolidar(self, setor=None, meses=None, cidades=None, politica=POLITICA_PADRAO):
+        """Tabela de nodes e KPIs para o filtro, agregados pelo SQLite"""
+        filtro = self._filtro(setor, meses, cidades)
+        agregados = {
+            col: "MAX" if POLITICAS[politica][col] == "max" else "AVG" for col in ("QOE ANTES", "QOE DEP")
+        }
+        if filtro is None:
+            df_nodes = pd.DataFrame(columns=["Node", "QOE ANTES", "QOE DEP"])
+            acoes = 0
+        else:
+            where, parametros = filtro
+            df_nodes = self._consultar(
+                f"SELECT {_q('Node')}, "
+                + ", ".join(f"{func}({_q(col)}) AS {_q(col)}" for col, func in agregados.items())
+                + f" FROM {TABELA} {self._e(where, _q('Node') + ' IS NOT NULL')}"
+                + f" GROUP BY {_q('Node')} ORDER BY {_q('Node')}",
+                parametros,
+            )
+            acoes = int(self._consultar(f"SELECT COUNT(*) AS n FROM {TABELA} {where}", parametros)["n"].iloc[0])
+
+        for col in agregados:
+            df_nodes[col] = df_nodes[col].astype("float64")
+        df_nodes = marcar_evolucao(df_nodes)
+        return df_nodes, calcular_kpis(df_nodes, acoes)
+
+    def _contar(self, coluna, rotulo, setor=None, meses=None, cidades=None):
+        filtro = self._filtro(setor, meses, cidades)
+        if coluna not in self.colunas or filtro is None:
+            return pd.DataFrame(columns=[coluna, rotulo])
+        where, parametros = filtro
+        return self._consultar(
+            f"SELECT {_q(coluna)}, COUNT(*) AS {_q(rotulo)} FROM {TABELA} "
+            f"{self._e(where, _q(coluna) + ' IS NOT NULL')} GROUP BY {_q(coluna)} ORDER BY {_q(coluna)}",
+            parametros,
+        )
+
+    @instrumentar("sql.acoes_por_cidade")
+    def acoes_por_cidade(self, setor=None, meses=None, cidades=None):
+        """Número de ações por cidade (colunas Cidade, Ações)"""
+        return self._contar("Cidade", "Ações", setor, meses, cidades)
+
+    @instrumentar("sql.contar_motivos")
+    def contar_motivos(self, setor=None, meses=None, cidades=None):
+        """Número de ações por motivo (colunas Motivo, Quantidade)"""
+        return self._contar("Motivo", "Quantidade", setor, meses, cidades)
+
+    @instrumentar("sql.linhas")
+    def linhas(self, setor=None, meses=None, cidades=None, colunas=None):
+        """Ações que atendem ao filtro, na ordem da planilha (tabela de registros detalhados)"""
+        colunas = [c for c in (colunas or self.colunas) if c in self.colunas and c != "_linha"]
+        filtro = self._filtro(setor, meses, cidades)
+        if filtro is None:
+            return pd.DataFrame(columns=colunas)
+        where, parametros = filtro
+        return self._consultar(
+            f"SELECT {', '.join(_q(c) for c in colunas)} FROM {TABELA} {where} ORDER BY _linha",
+            parametros,
+        )
+
+
+@instrumentar("sql.construir_em_blocos")
+def construir_base_em_blocos(caminho=None, destino=None, tamanho_bloco=None):
+    """
+    BaseSQL da fonte gravada bloco a bloco (modules.out_of_core), sem
+    carregar os dados inteiros. O arquivo (padrão: o mesmo de
+    caminho_base) fica com a versão de carregar_dados, então o painel com
+    QOE_BACKEND=sqlite o reaproveita em vez de gravá-lo de novo.
+    """
+    caminho = resolver_fonte(caminho)
+    versao, blocos = blocos_fonte(caminho, tamanho_bloco)
+    return BaseSQL(destino or _caminho_base_fonte(caminho), versao=versao, blocos=blocos)
+
+
+def obter_base_sql(dados):
+    """BaseSQL da versão carregada (arquivo gravado na primeira chamada, se ainda não existir)"""
+    return dados.derivado("base_sql", lambda df: BaseSQL(caminho_base(dados), df, dados.versao))
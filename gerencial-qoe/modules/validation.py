@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+
+# QOE ainda não medido: a ação é aceita com o QOE vazio
+QOE_PENDENTE = {"ATUALIZANDO"}
+QOE_MINIMO, QOE_MAXIMO = 0, 100
+DATA_MINIMA = pd.Timestamp("2000-01-01")
+
+COLUNA_LINHA = "Linha"
+COLUNA_MOTIVO = "Motivo da rejeição"
+SEPARADOR_MOTIVOS = "; "
+
+
+def _mascara(n, posicoes):
+    mascara = np.zeros(n, dtype=bool)
+    mascara[posicoes] = True
+    return mascara
+
+
+def _texto_nao_vazio(bruto, suspeitos):
+    """Máscara (do tamanho de bruto) das linhas suspeitas cujo texto não é vazio"""
+    posicoes = np.flatnonzero(suspeitos)
+    texto = bruto.iloc[posicoes].astype("string").str.strip()
+    return _mascara(len(bruto), posicoes[(texto != "").to_numpy(dtype=bool, na_value=False)]), texto
+
+
+def validar_qoe(bruto):
+    """
+    (QOE float32, {motivo: máscara}) de uma coluna de QOE como lida do Excel.
+    Texto que não é número nem QOE pendente e valores fora de 0–100 são
+    rejeitados; células vazias e QOE pendente viram NaN.
+    """
+    valores = pd.to_numeric(bruto, errors="coerce")
+    motivos = {}
+    if not pd.api.types.is_numeric_dtype(bruto):
+        # Só as células que não viraram número (poucas) são examinadas como texto
+        suspeitos = (valores.isna() & bruto.notna()).to_numpy()
+        if suspeitos.any():
+            nao_vazio, texto = _texto_nao_vazio(bruto, suspeitos)
+            pendente = _mascara(len(bruto), np.flatnonzero(suspeitos)[
+                texto.str.upper().isin(QOE_PENDENTE).to_numpy(dtype=bool, na_value=False)])
+            motivos["não numérico"] = nao_vazio & ~pendente
+    motivos["fora de 0–100"] = ((valores < QOE_MINIMO) | (valores > QOE_MAXIMO)).to_numpy(dtype=bool, na_value=False)
+    return valores.astype("float32"), motivos
+
+
+def validar_datas(bruto, limite=None):
+    """
+    (datas, {motivo: máscara}) da coluna Data Execução. Texto que não é
+    data e datas antes de DATA_MINIMA ou depois de `limite` (padrão: agora)
+    são rejeitados; células vazias viram NaT.
+    """
+    datas = pd.to_datetime(bruto, errors="coerce")
+    motivos = {}
+    suspeitos = (datas.isna() & bruto.notna()).to_numpy()
+    if suspeitos.any():
+        motivos["inválida"] = _texto_nao_vazio(bruto, suspeitos)[0]
+    limite = pd.Timestamp.now() if limite is None else limite
+    motivos["fora do período"] = ((datas < DATA_MINIMA) | (datas > limite)).to_numpy(dtype=bool, na_value=False)
+    return datas, motivos
+
+
+def normalizar_texto(serie, maiusculas):
+    """
+    Dimensão de texto como category: sem espaços nas pontas, espaços
+    internos repetidos reduzidos a um e, nas chaves, em maiúsculas; texto
+    vazio vira NaN.
+
+    A normalização é feita nas categorias distintas (poucas) e as linhas
+    são remapeadas pelos códigos, sem operar texto linha a linha.
+    """
+    bruta = serie.astype("string").astype("category")
+    categorias = bruta.cat.categories.str.strip().str.replace(r"\s+", " ", regex=True)
+    if maiusculas:
+        categorias = categorias.str.upper()
+    validas = (categorias != "").to_numpy(dtype=bool, na_value=False)
+    novas, posicao = np.unique(categorias[validas].to_numpy(dtype=object), return_inverse=True)
+    mapa = np.full(len(categorias) + 1, -1, dtype=np.int32)  # último: código -1 (vazio)
+    mapa[np.flatnonzero(validas)] = posicao
+    codigos = mapa[bruta.cat.codes.to_numpy()]
+    tipo = pd.CategoricalDtype(pd.Index(novas, dtype=categorias.dtype))
+    return pd.Series(pd.Categorical.from_codes(codigos, dtype=tipo), index=serie.index, name=serie.name)
+
+
+def montar_quarentena(bruto, rejeicoes):
+    """
+    (quarentena, máscara das rejeitadas): linhas rejeitadas do bloco como
+    lidas do Excel (valores em texto), com a linha da planilha (cabeçalho
+    na linha 1) e os motivos separados por "; ".
+    """
+    rejeitadas = np.zeros(len(bruto), dtype=bool)
+    for mascara in rejeicoes.values():
+        rejeitadas |= mascara
+    posicoes = np.flatnonzero(rejeitadas)
+
+    # Texto dos motivos montado só para as linhas rejeitadas
+    motivos = np.full(len(posicoes), "", dtype=object)
+    for nome, mascara in rejeicoes.items():
+        marcadas = mascara[posicoes]
+        motivos[marcadas] += nome + SEPARADOR_MOTIVOS
+    linhas = bruto.iloc[posicoes]
+    quarentena = pd.DataFrame({
+        COLUNA_LINHA: np.asarray(linhas.index, dtype="int64") + 2,
+        COLUNA_MOTIVO: [m[:-len(SEPARADOR_MOTIVOS)] for m in motivos],
+    })
+    for col in bruto.columns:
+        quarentena[col] = [None if pd.isna(v) else str(v) for v in linhas[col]]
+    return quarentena, rejeitadas
+
+
+def juntar_quarentenas(quarentenas):
+    quarentenas = [q for q in quarentenas if q is not None]
+    if not quarentenas:
+        return pd.DataFrame(columns=[COLUNA_LINHA, COLUNA_MOTIVO])
+    return pd.concat(quarentenas, ignore_index=True)
+
+
+def resumo_quarentena(quarentena):
+    """Linhas rejeitadas por motivo (uma linha pode ter vários), do mais frequente ao menos"""
+    if quarentena is None or quarentena.empty:
+        return pd.DataFrame(columns=["Motivo", "Linhas"])
+    motivos = quarentena[COLUNA_MOTIVO].str.split(SEPARADOR_MOTIVOS).explode()
+    return motivos.value_counts().rename_axis("Motivo").reset_index(name="Linhas")
+
+
+def quarentena_para_json(quarentena):
+    """Quarentena em dict serializável (colunas + linhas), para o Parquet e o manifesto"""
+    return {"colunas": list(quarentena.columns), "linhas": quarentena.astype(object).values.tolist()}
+
+
+def quarentena_de_json(dados):
+    quarentena = pd.DataFrame(dados["linhas"], columns=dados["colunas"])
+    if COLUNA_LINHA in quarentena.columns:
+        quarentena[COLUNA_LINHA] = quarentena[COLUNA_LINHA].astype("int64")
+    return quarentena
@@ -0,0 +1,134 @@
+import glob
+import os
+import threading
+import time
+import zipfile
+from datetime import datetime
+
+from modules import loader
+from modules.config import BACKEND_CONSULTAS, ESTABILIDADE_DADOS_S, INTERVALO_OBSERVADOR_S
+from modules.profiling import instrumentar
+
+
+def preparar_dados(dados):
+    """Estruturas consultadas pelo painel, construídas antes da versão ser publicada"""
+    from modules.catalog import obter_catalogo
+
+    if BACKEND_CONSULTAS == "sqlite":
+        from modules.sql_backend import obter_base_sql
+
+        obter_base_sql(dados)
+    else:
+        from modules.cube import obter_cubo
+        from modules.filters import obter_indice
+
+        obter_cubo(dados)
+        obter_indice(dados)
+    obter_catalogo(dados)
+
+
+def _planilhas_completas(caminho):
+    """
+    False se alguma planilha ainda está sendo gravada: um .xlsx é um zip, e o
+    índice do zip é a última parte escrita do arquivo
+    """
+    planilhas = glob.glob(os.path.join(caminho, "*.xlsx")) if os.path.isdir(caminho) else [caminho]
+    return all(
+        zipfile.is_zipfile(p) for p in planilhas if not os.path.basename(p).startswith("~$")
+    )
+
+
+class ObservadorDados(threading.Thread):
+    """
+    Thread que verifica a fonte dos dados a cada `intervalo` segundos e,
+    quando ela muda, espera o arquivo ficar estável (mesmo tamanho e mtime
+    por `estabilidade` segundos, com o zip completo) para então ler,
+    validar e construir as estruturas da nova versão fora das requisições.
+
+    A nova versão só substitui a anterior no cache quando está pronta; até
+    lá as sessões continuam usando a anterior. Se a leitura falha (ex.:
+    planilha inválida), a versão anterior continua publicada e o erro fica
+    em `ultimo_erro` até a próxima mudança do arquivo.
+    """
+
+    def __init__(self, caminho, intervalo=INTERVALO_OBSERVADOR_S, estabilidade=ESTABILIDADE_DADOS_S):
+        super().__init__(name="observador-dados", daemon=True)
+        self.caminho = loader.resolver_fonte(caminho)
+        self.intervalo = intervalo
+        self.estabilidade = estabilidade
+        self.ultimo_erro = None
+        self.verificado_em = None
+        self._parar = threading.Event()
+        self._candidata = None  # (assinatura, desde quando está igual)
+        self._falhou = None     # assinatura cuja leitura falhou
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.verificar()
+            except Exception as e:  # a thread não pode morrer: tenta de novo no próximo ciclo
+                self.ultimo_erro = f"{datetime.now():%d/%m/%Y %H:%M:%S}: {e}"
+
+    def parar(self):
+        self._parar.set()
+
+    def verificar(self):
+        """Um ciclo do observador; retorna True se publicou uma nova versão"""
+        self.verificado_em = datetime.now()
+        if not os.path.exists(self.caminho):
+            return False
+        assinatura = loader.assinatura_fonte(self.caminho)
+        publicada = loader.versao_em_cache(self.caminho)
+        if (publicada is not None and publicada.assinatura == assinatura) or assinatura == self._falhou:
+            self._candidata = None
+            return False
+
+        agora = time.monotonic()
+        if self._candidata is None or self._candidata[0] != assinatura:
+            self._candidata = (assinatura, agora)
+            return False
+        if agora - self._candidata[1] < self.estabilidade or not _planilhas_completas(self.caminho):
+            return False
+
+        self._candidata = None
+        try:
+            nova = self._carregar()
+        except Exception as e:
+            self._falhou = assinatura
+            self.ultimo_erro = f"{datetime.now():%d/%m/%Y %H:%M:%S}: {e}"
+            return False
+        self._falhou = None
+        self.ultimo_erro = None
+        return nova is not publicada
+
+    @instrumentar("watcher.carregar")
+    def _carregar(self):
+        return loader.atualizar_dados(self.caminho, preparar=preparar_dados)
+
+
+_observadores = {}
+_lock_observadores = threading.Lock()
+
+
+def iniciar_observador(caminho):
+    """
+    Observador do caminho (um por processo, iniciado na primeira chamada).
+    A partir daí carregar_dados devolve a versão publicada por ele.
+    """
+    caminho = loader.resolver_fonte(caminho)
+    with _lock_observadores:
+        observador = _observadores.get(caminho)
+        if observador is None or not observador.is_alive():
+            observador = ObservadorDados(caminho)
+            observador.start()
+            _observadores[caminho] = observador
+            loader.observar(caminho)
+        return observador
+
+
+def parar_observadores():
+    with _lock_observadores:
+        for caminho, observador in _observadores.items():
+            observador.parar()
+            loader.observar(caminho, ativo=False)
+        _observadores.clear()